@@ -0,0 +1,105 @@
+"""
+JWT authentication that builds `request.user` from the token's claims.
+
+Access tokens already carry the user's id, role, email and first name (see
+`add_user_claims`), which is all the permission classes read. Instead of
+loading the user row on every request, `ClaimsJWTAuthentication` builds a
+`CustomUser` through `from_db()` with just those fields loaded; any other
+field is fetched lazily on first access, and the instance still works as a
+foreign key value in queries and new rows.
+
+Tokens also carry the user's `token_version`. `change_user_role` bumps it,
+and with `ACCOUNTS_TOKEN_VERSION_CACHE_TIMEOUT` set, each request checks the
+version (and `is_active`) against a cached copy that expires after the
+timeout, so older tokens stop working shortly after the change. Refreshing
+then issues an access token with the new claims.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser
+
+# Claim -> CustomUser field, loaded from the token.
+CLAIM_FIELDS = {
+    'email': 'email',
+    'first_name': 'first_name',
+    'role': 'role',
+}
+VERSION_CLAIM = 'ver'
+
+# Cached for users that no longer exist, since the cache cannot hold None.
+MISSING = 'missing'
+
+
+def add_user_claims(token, user):
+    for claim, field in CLAIM_FIELDS.items():
+        token[claim] = getattr(user, field)
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def get_cache():
+    return caches[settings.ACCOUNTS_TOKEN_VERSION_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'accounts:token-version:{user_id}'
+
+
+def current_version(user_id):
+    """
+    `(token_version, is_active)` of a user, cached for
+    ACCOUNTS_TOKEN_VERSION_CACHE_TIMEOUT seconds; None if the user is gone.
+    """
+    cache = get_cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = (
+            CustomUser.objects.filter(pk=user_id)
+            .values_list('token_version', 'is_active')
+            .first()
+        ) or MISSING
+        cache.set(_version_key(user_id), version, settings.ACCOUNTS_TOKEN_VERSION_CACHE_TIMEOUT)
+    return None if version == MISSING else tuple(version)
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached version. With a shared cache every process sees the
+    change at once; with a per-process cache the others expire theirs.
+    """
+    get_cache().delete(_version_key(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request user query. Tokens issued
+    before the claims were added fall back to loading the user.
+    """
+
+    def get_user(self, validated_token):
+        claims = [api_settings.USER_ID_CLAIM, VERSION_CLAIM, *CLAIM_FIELDS]
+        if any(claim not in validated_token for claim in claims):
+            return super().get_user(validated_token)
+        # simplejwt stores the id as a string.
+        user_id = CustomUser._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+
+        if settings.ACCOUNTS_TOKEN_VERSION_CACHE_TIMEOUT is not None:
+            version = current_version(user_id)
+            if version is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            token_version, is_active = version
+            if not is_active:
+                raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+            if validated_token[VERSION_CLAIM] != token_version:
+                raise AuthenticationFailed(_('Token is outdated, please refresh it.'), code='token_outdated')
+
+        loaded = {'id': user_id, 'is_active': True}
+        loaded.update((field, validated_token[claim]) for claim, field in CLAIM_FIELDS.items())
+        # from_db() expects values in the model's field order.
+        fields = [field.attname for field in CustomUser._meta.concrete_fields if field.attname in loaded]
+        return CustomUser.from_db('default', fields, [loaded[field] for field in fields])
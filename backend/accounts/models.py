@@ -34,6 +34,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(auto_now_add=True)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='buyer')
+    # Copied into access tokens; bumping it makes older tokens stale.
+    token_version = models.PositiveIntegerField(default=0)
 
     objects = CustomUserManager()
 
@@ -2,7 +2,10 @@
 
 from rest_framework import serializers
 from .models import CustomUser, SellerApplication  # ✅ Import SellerApplication
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import add_user_claims
 
 class CustomUserSerializer(serializers.ModelSerializer):
     role = serializers.CharField(read_only=True)
@@ -26,10 +29,22 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token['role'] = user.role
-        token['email'] = user.email
-        token['first_name'] = user.first_name
-        return token
+        return add_user_claims(token, user)
+
+
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Issues the new access token with the user's current claims, so a
+    changed role (and token_version) is picked up on refresh.
+    """
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # Already verified by super().validate().
+        refresh = RefreshToken(attrs['refresh'], verify=False)
+        user = CustomUser.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM]).first()
+        if user is not None:
+            data['access'] = str(add_user_claims(refresh.access_token, user))
+        return data
 
 
 class SellerApplicationSerializer(serializers.ModelSerializer):  # ✅ এবার ঠিক জায়গায়
@@ -1,3 +1,188 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from properties.tests import LOCMEM_CACHES
+from real_state.throttling import SlidingWindowThrottle, local_counters, retry_after
+from .authentication import ClaimsJWTAuthentication, current_version, get_cache as get_version_cache, invalidate_user
+from .models import CustomUser
+from .serializers import MyTokenObtainPairSerializer
+
+RATES = {
+    'login': {'ip': '3/min'},
+    'register': {'ip': '2/hour'},
+    'inquiry': {'user': '2/min'},
+    'favorite': {'user': '2/min'},
+}
+
+
+@override_settings(THROTTLE_RATES=RATES)
+class ThrottleTests(TestCase):
+
+    def setUp(self):
+        local_counters.clear()
+        self.client = APIClient()
+        self.now = 1_000_000 * 60.0
+        patcher = mock.patch.object(SlidingWindowThrottle, 'timer', mock.Mock(side_effect=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, address='10.0.0.1', **headers):
+        return self.client.post(
+            reverse('token_obtain_pair'),
+            {'email': 'nobody@example.com', 'password': 'wrong'},
+            format='json', REMOTE_ADDR=address, **headers,
+        )
+
+    def test_login_is_limited_per_ip(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 401)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        # Over the limit within the current window: wait for it to slide out.
+        self.assertEqual(response['Retry-After'], str(retry_after(0, 4, 3, 60, 0)))
+        self.assertEqual(self.login('10.0.0.2').status_code, 401)
+
+    def test_forwarded_for_cannot_pick_the_key(self):
+        statuses = [self.login(HTTP_X_FORWARDED_FOR=f'203.0.113.{index}').status_code for index in range(6)]
+        self.assertEqual(statuses, [401] * 3 + [429] * 3)
+
+    def test_favorite_sync_shares_the_favorite_limit(self):
+        user = CustomUser.objects.create_user('buyer@example.com', 'secret123')
+        self.client.force_authenticate(user)
+        self.client.post(reverse('add_favorite'), {'property': 999}, format='json')
+        self.client.post(reverse('sync_favorites'), {'add': [999]}, format='json')
+        self.assertEqual(self.client.post(reverse('sync_favorites'), {'add': [999]}, format='json').status_code, 429)
+
+    def test_window_slides(self):
+        for _ in range(3):
+            self.login()
+        # Half way through the next minute the previous 3 count as 1.5.
+        self.now += 90
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login().status_code, 429)
+        self.now += 60
+        self.assertEqual(self.login().status_code, 401)
+
+    def test_registration_is_limited_but_listing_is_not(self):
+        for index in range(2):
+            response = self.client.post(reverse('user-list'), {
+                'email': f'user{index}@example.com', 'password': 'secret123',
+            }, format='json')
+            self.assertNotEqual(response.status_code, 429)
+        self.assertEqual(self.client.post(reverse('user-list'), {}, format='json').status_code, 429)
+        self.assertEqual(self.client.get(reverse('user-list')).status_code, 200)
+
+    @override_settings(CACHES=LOCMEM_CACHES, THROTTLE_CACHE_ALIAS='properties')
+    def test_inquiries_are_limited_per_user_in_shared_cache(self):
+        caches['properties'].clear()
+        users = [CustomUser.objects.create_user(f'buyer{index}@example.com', 'secret123') for index in range(2)]
+        statuses = []
+        for user in [users[0]] * 3 + [users[1]]:
+            self.client.force_authenticate(user)
+            statuses.append(self.client.post(reverse('inquiry-create'), {}, format='json').status_code)
+        self.assertEqual(statuses, [400, 400, 429, 400])
+
+
+class RetryAfterTests(TestCase):
+
+    def test_waits_for_previous_window_to_slide_out(self):
+        # 10 last window, 2 now, limit 6: needs the estimate 10 * (1 - f) + 2 <= 6.
+        self.assertEqual(retry_after(10, 2, 6, 60, 0), 36)
+        self.assertEqual(retry_after(10, 2, 6, 60, 30), 6)
+
+    def test_waits_into_next_window_when_current_is_over(self):
+        self.assertEqual(retry_after(0, 12, 6, 60, 30), 60)
+
+
+class ClaimsAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = CustomUser.objects.create_user('root@example.com', 'secret123', role='superadmin')
+        cls.buyer = CustomUser.objects.create_user('buyer@example.com', 'secret123', first_name='Bea')
+
+    def setUp(self):
+        get_version_cache().clear()
+        self.client = APIClient()
+
+    def tokens(self, user):
+        response = self.client.post(reverse('token_obtain_pair'), {'email': user.email, 'password': 'secret123'}, format='json')
+        return response.data
+
+    def get(self, name, access):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name), HTTP_AUTHORIZATION=f'Bearer {access}')
+        user_queries = [query['sql'] for query in queries if 'accounts_customuser' in query['sql']]
+        return response, user_queries
+
+    def test_user_is_built_from_claims(self):
+        access = self.tokens(self.buyer)['access']
+        response, user_queries = self.get('favorite_ids', access)
+        self.assertEqual(response.status_code, 200)
+        # One version check, then nothing until the cached version expires.
+        self.assertEqual(len(user_queries), 1)
+        self.assertNotIn('password', user_queries[0])
+        response, user_queries = self.get('favorite_ids', access)
+        self.assertEqual((response.status_code, user_queries), (200, []))
+
+    def test_claims_user_behaves_like_a_user(self):
+        token = MyTokenObtainPairSerializer.get_token(self.buyer).access_token
+        user = ClaimsJWTAuthentication().get_user(token)
+        self.assertEqual((user.pk, user.role, user.email, user.first_name), (self.buyer.pk, 'buyer', 'buyer@example.com', 'Bea'))
+        self.assertTrue(user.is_authenticated)
+        with self.assertNumQueries(1):
+            self.assertIsNotNone(user.date_joined)
+
+    @override_settings(ACCOUNTS_TOKEN_VERSION_CACHE_TIMEOUT=None)
+    def test_without_version_check_no_query_is_made(self):
+        access = self.tokens(self.superadmin)['access']
+        response, user_queries = self.get('user-list', access)
+        self.assertEqual((response.status_code, user_queries[1:]), (200, []))
+        self.assertNotIn('WHERE', user_queries[0])
+
+    def test_role_change_outdates_tokens(self):
+        buyer_tokens = self.tokens(self.buyer)
+        self.assertEqual(self.get('property-image-stats', buyer_tokens['access'])[0].status_code, 403)
+
+        response = self.client.patch(
+            reverse('change-user-role', args=[self.buyer.id]), {'role': 'admin'},
+            format='json', HTTP_AUTHORIZATION=f"Bearer {self.tokens(self.superadmin)['access']}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.token_version, 1)
+
+        response = self.get('property-image-stats', buyer_tokens['access'])[0]
+        self.assertEqual((response.status_code, response.data['code']), (401, 'token_outdated'))
+
+        refreshed = self.client.post(reverse('token_refresh'), {'refresh': buyer_tokens['refresh']}, format='json')
+        access = AccessToken(refreshed.data['access'])
+        self.assertEqual((access['role'], access['ver']), ('admin', 1))
+        self.assertEqual(self.get('property-image-stats', refreshed.data['access'])[0].status_code, 200)
+
+    def test_tokens_without_claims_load_the_user(self):
+        access = AccessToken.for_user(self.buyer)
+        response, user_queries = self.get('favorite_ids', access)
+        self.assertEqual((response.status_code, len(user_queries)), (200, 1))
+        self.assertIn('password', user_queries[0])
+
+    def test_versions_are_kept_in_the_cache(self):
+        access = self.tokens(self.buyer)['access']
+        self.get('favorite_ids', access)
+        self.assertEqual(current_version(self.buyer.id), (0, True))
+        # Another process bumping the version only has to drop the entry.
+        CustomUser.objects.filter(pk=self.buyer.id).update(token_version=3)
+        invalidate_user(self.buyer.id)
+        self.assertEqual(self.get('favorite_ids', access)[0].data['code'], 'token_outdated')
+
+        CustomUser.objects.filter(pk=self.buyer.id).delete()
+        invalidate_user(self.buyer.id)
+        self.assertEqual(self.get('favorite_ids', access)[0].data['code'], 'user_not_found')
+        self.assertIsNone(current_version(self.buyer.id))
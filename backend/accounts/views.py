@@ -3,15 +3,19 @@ from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-from rest_framework_simplejwt.views import TokenObtainPairView
+from django.db.models import F
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from .models import CustomUser
 from .serializers import (
     SellerApplicationSerializer,
     CustomUserSerializer,
-    MyTokenObtainPairSerializer
+    MyTokenObtainPairSerializer,
+    MyTokenRefreshSerializer,
 )
+from .authentication import invalidate_user
 from .permission import IsSuperAdmin
+from real_state.throttling import scoped_throttles
 
 
 # ------------------------------------------------------------------
@@ -24,6 +28,15 @@ class MyTokenObtainPairView(TokenObtainPairView):
     Uses a custom serializer to include 'role' in the access token.
     """
     serializer_class = MyTokenObtainPairSerializer
+    # Every attempt runs the password hasher.
+    throttle_classes = scoped_throttles('login')
+
+
+class MyTokenRefreshView(TokenRefreshView):
+    """
+    Token refresh that puts the user's current role into the new access token.
+    """
+    serializer_class = MyTokenRefreshSerializer
 
 
 # ------------------------------------------------------------------
@@ -38,6 +51,8 @@ class UserListView(APIView):
     """
     # Uncomment this in production
     # permission_classes = [IsAdminUser]
+    # Only POST (registration) is throttled.
+    throttle_classes = scoped_throttles('register')
 
     def get(self, request):
         users = CustomUser.objects.all()
@@ -91,8 +106,11 @@ def change_user_role(request, user_id):
             status=status.HTTP_403_FORBIDDEN
         )
 
+    # Tokens carrying the old role stop authenticating once the version changes.
     user_to_change.role = new_role
-    user_to_change.save(update_fields=['role'])
+    user_to_change.token_version = F('token_version') + 1
+    user_to_change.save(update_fields=['role', 'token_version'])
+    invalidate_user(user_to_change.id)
 
     return Response(
         {'message': f"User's role successfully updated to '{new_role}'."},
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import transaction
+
+from properties.cache import get_cache
+
+from .models import Favorite
+
+
+def _ids_key(user_id):
+    return f'favorites:ids:{user_id}'
+
+
+def favorite_property_ids(user_id):
+    """Ids of the listings a user has favorited, newest favorite first; cached per user."""
+    cache = get_cache()
+    key = _ids_key(user_id)
+    property_ids = cache.get(key)
+    if property_ids is None:
+        # Served by the (user, property) unique index.
+        property_ids = list(
+            Favorite.objects.filter(user_id=user_id).order_by('-id').values_list('property_id', flat=True)
+        )
+        cache.set(key, property_ids, settings.FAVORITE_IDS_CACHE_TIMEOUT)
+    return property_ids
+
+
+def invalidate_favorite_ids(*user_ids):
+    """Drop the cached ids now and after commit, as invalidate_properties_on_write does."""
+    keys = [_ids_key(user_id) for user_id in user_ids]
+    get_cache().delete_many(keys)
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
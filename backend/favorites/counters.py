@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from properties.cache import invalidate_popularity_on_write
+from properties.models import Property
+
+from .models import Favorite
+
+
+def favorites_count_subquery():
+    """The true number of favorites of the outer listing."""
+    counts = (
+        Favorite.objects.filter(property=OuterRef('pk'))
+        .order_by().values('property').annotate(count=Count('id')).values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def adjust_favorites_count(property_ids, delta):
+    """
+    Atomically add `delta` to the listings' counters, never going below
+    zero, and invalidate the listings' cached responses and the popularity
+    rankings. `updated_at` is left alone: the count is not an edit.
+    """
+    listings = Property.objects.filter(pk__in=property_ids)
+    if delta < 0:
+        listings = listings.filter(favorites_count__gte=-delta)
+    listings.update(favorites_count=F('favorites_count') + delta)
+    invalidate_popularity_on_write(*property_ids)
+
+
+def remove_favorites(user, property_ids):
+    """
+    Delete the user's favorites of `property_ids` and decrement the counters
+    of the listings whose row was actually deleted here. The rows are locked
+    first, so a concurrent removal of the same favorite waits and then finds
+    nothing to delete or count. Returns the ids of those listings.
+    """
+    with transaction.atomic(savepoint=False):
+        rows = dict(
+            Favorite.objects.select_for_update()
+            .filter(user=user, property_id__in=property_ids)
+            .values_list('pk', 'property_id')
+        )
+        if rows:
+            Favorite.objects.filter(pk__in=rows).delete()
+            adjust_favorites_count(list(rows.values()), -1)
+    return sorted(rows.values())
+
+
+def recount_favorites(property_ids=None):
+    """
+    Set `favorites_count` to the real count wherever it has drifted, in one
+    UPDATE. Limited to `property_ids` when given. Returns the rows repaired.
+    """
+    listings = Property.objects.all() if property_ids is None else Property.objects.filter(pk__in=property_ids)
+    drifted = listings.alias(actual=favorites_count_subquery()).exclude(favorites_count=F('actual'))
+    repaired = list(drifted.values_list('pk', flat=True))
+    if repaired:
+        Property.objects.filter(pk__in=repaired).update(favorites_count=favorites_count_subquery())
+        invalidate_popularity_on_write(*repaired)
+    return len(repaired)
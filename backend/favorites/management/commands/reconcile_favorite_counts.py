@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from favorites.counters import recount_favorites
+
+
+class Command(BaseCommand):
+    help = 'Repair Property.favorites_count wherever it differs from the real number of favorites.'
+
+    def handle(self, *args, **options):
+        repaired = recount_favorites()
+        self.stdout.write(self.style.SUCCESS(f'Repaired the favorite count of {repaired} listings.'))
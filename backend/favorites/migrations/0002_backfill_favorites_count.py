@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    Favorite = apps.get_model('favorites', 'Favorite')
+    Property = apps.get_model('properties', 'Property')
+    counts = (
+        Favorite.objects.filter(property=OuterRef('pk'))
+        .order_by().values('property').annotate(count=Count('id')).values('count')
+    )
+    Property.objects.update(favorites_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('favorites', '0001_initial'),
+        ('properties', '0013_property_favorites_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,6 @@
+from properties.pagination import KeysetCursorPagination
+
+
+class FavoriteCursorPagination(KeysetCursorPagination):
+    # Most recently saved first.
+    ordering = ('-id',)
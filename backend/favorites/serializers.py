@@ -8,4 +8,9 @@ class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Favorite
         fields = '__all__'
-        read_only_fields = ['user']
\ No newline at end of file
+        read_only_fields = ['user']
+
+
+class FavoriteSyncSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
+    remove = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
@@ -0,0 +1,31 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from properties.models import Property
+
+from .cache import invalidate_favorite_ids
+from .counters import adjust_favorites_count
+from .models import Favorite
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+def invalidate_user_favorites(sender, instance, **kwargs):
+    invalidate_favorite_ids(instance.user_id)
+
+
+@receiver(post_save, sender=Favorite)
+def count_added_favorite(sender, instance, created, **kwargs):
+    if created:
+        adjust_favorites_count([instance.property_id], 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def count_cascaded_favorite(sender, instance, origin=None, **kwargs):
+    # Favorites are removed through remove_favorites(), which counts the
+    # rows it deletes; this covers the ones deleted along with their user.
+    # Other direct deletes (e.g. in the admin) are left to
+    # `manage.py reconcile_favorite_counts`.
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model not in (Favorite, Property):
+        adjust_favorites_count([instance.property_id], -1)
@@ -1,3 +1,230 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from properties.models import Property, PropertyImage
+from properties.cache import get_cache
+from properties.tests import LOCMEM_CACHES, create_property
+from .counters import remove_favorites
+from .models import Favorite
+
+
+class FavoriteQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = CustomUser.objects.create_user('buyer@example.com', 'secret123')
+        for index in range(6):
+            seller = CustomUser.objects.create_user(f'seller{index}@example.com', 'secret123', role='seller')
+            prop = create_property(seller, index)
+            PropertyImage.objects.create(property=prop, image=f'https://img.example.com/{index}.jpg')
+            Favorite.objects.create(user=cls.buyer, property=prop)
+
+    def test_list_favorites_query_count(self):
+        client = APIClient()
+        client.force_authenticate(self.buyer)
+        with self.assertNumQueries(2):
+            response = client.get(reverse('list_favorites'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual(len(response.data['results'][0]['property']['images']), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FavoriteIdsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = CustomUser.objects.create_user('buyer@example.com', 'secret123')
+        seller = CustomUser.objects.create_user('seller@example.com', 'secret123', role='seller')
+        cls.props = [create_property(seller, index) for index in range(4)]
+        for prop in cls.props[:2]:
+            Favorite.objects.create(user=cls.buyer, property=prop)
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def test_ids_are_cached_until_changed(self):
+        self.assertEqual(self.client.get(reverse('favorite_ids')).data['ids'], [self.props[1].id, self.props[0].id])
+        with self.assertNumQueries(0):
+            self.client.get(reverse('favorite_ids'))
+
+        self.client.post(reverse('add_favorite'), {'property': self.props[2].id}, format='json')
+        self.assertEqual(self.client.get(reverse('favorite_ids')).data['ids'][0], self.props[2].id)
+        self.client.delete(reverse('remove_favorite'), {'property': self.props[0].id}, format='json')
+        self.assertNotIn(self.props[0].id, self.client.get(reverse('favorite_ids')).data['ids'])
+
+    def test_membership(self):
+        ids = f'{self.props[0].id},{self.props[3].id}'
+        response = self.client.get(reverse('favorite_ids'), {'property_ids': ids})
+        self.assertEqual(response.data['favorited'], {str(self.props[0].id): True, str(self.props[3].id): False})
+        self.assertEqual(self.client.get(reverse('favorite_ids'), {'property_ids': 'x'}).status_code, 400)
+
+    def test_list_is_paginated(self):
+        response = self.client.get(reverse('list_favorites'), {'page_size': 1})
+        self.assertEqual([row['property']['id'] for row in response.data['results']], [self.props[1].id])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['property']['id'] for row in response.data['results']], [self.props[0].id])
+        self.assertIsNone(response.data['next'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FavoriteSyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = CustomUser.objects.create_user('buyer@example.com', 'secret123')
+        seller = CustomUser.objects.create_user('seller@example.com', 'secret123', role='seller')
+        cls.props = [create_property(seller, index) for index in range(4)]
+        Favorite.objects.create(user=cls.buyer, property=cls.props[0])
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def sync(self, add=(), remove=()):
+        response = self.client.post(reverse('sync_favorites'), {'add': list(add), 'remove': list(remove)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_sync_is_idempotent(self):
+        batch = {'add': [self.props[0].id, self.props[1].id, self.props[2].id, 999999], 'remove': [self.props[2].id]}
+        first = self.sync(**batch)
+        self.assertEqual(sorted(first['ids']), [self.props[0].id, self.props[1].id])
+        self.assertEqual(first['unknown'], [999999])
+        self.assertEqual(self.sync(**batch)['ids'], first['ids'])
+        self.assertEqual(Favorite.objects.filter(user=self.buyer).count(), 2)
+
+    def test_statement_count(self):
+        # Property lookup and SAVEPOINT; the removal's locking SELECT, the
+        # SELECT for the delete signals, DELETE and counter decrement; the
+        # already-saved lookup; one INSERT in its own SAVEPOINT/RELEASE; the
+        # counter increment of the added listings; RELEASE, then the id list.
+        with self.assertNumQueries(13):
+            self.sync(add=[self.props[1].id, self.props[2].id], remove=[self.props[0].id])
+        self.assertEqual(self.client.get(reverse('favorite_ids')).data['ids'], self.sync()['ids'])
+
+
+class FavoriteCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = CustomUser.objects.create_user('seller@example.com', 'secret123', role='seller')
+        cls.buyers = [CustomUser.objects.create_user(f'buyer{index}@example.com', 'secret123') for index in range(3)]
+        cls.props = [create_property(seller, index) for index in range(3)]
+
+    def count(self, prop):
+        return Property.objects.values_list('favorites_count', flat=True).get(pk=prop.pk)
+
+    def test_add_remove_and_sync_keep_counts(self):
+        client = APIClient()
+        client.force_authenticate(self.buyers[0])
+        client.post(reverse('add_favorite'), {'property': self.props[0].id}, format='json')
+        client.post(reverse('add_favorite'), {'property': self.props[0].id}, format='json')
+        self.assertEqual(self.count(self.props[0]), 1)
+
+        client.post(reverse('sync_favorites'), {'add': [self.props[0].id, self.props[1].id]}, format='json')
+        client.post(reverse('sync_favorites'), {'add': [self.props[1].id]}, format='json')
+        self.assertEqual([self.count(prop) for prop in self.props], [1, 1, 0])
+
+        client.delete(reverse('remove_favorite'), {'property': self.props[0].id}, format='json')
+        self.assertEqual(self.count(self.props[0]), 0)
+
+    def test_reconcile_repairs_drift(self):
+        for buyer in self.buyers:
+            Favorite.objects.create(user=buyer, property=self.props[0])
+        Property.objects.filter(pk=self.props[0].pk).update(favorites_count=7)
+        Property.objects.filter(pk=self.props[1].pk).update(favorites_count=2)
+        out = StringIO()
+        call_command('reconcile_favorite_counts', stdout=out)
+        self.assertIn('Repaired the favorite count of 2 listings', out.getvalue())
+        self.assertEqual([self.count(prop) for prop in self.props], [3, 0, 0])
+
+    def test_most_saved_and_popular_ordering(self):
+        for buyer in self.buyers:
+            Favorite.objects.create(user=buyer, property=self.props[1])
+        Favorite.objects.create(user=self.buyers[0], property=self.props[2])
+
+        response = APIClient().get(reverse('property-most-saved'), {'fields': 'card'})
+        self.assertEqual([(row['id'], row['favorites_count']) for row in response.data], [
+            (self.props[1].id, 3), (self.props[2].id, 1),
+        ])
+
+        response = APIClient().get(reverse('property-list-create'), {'ordering': 'popular', 'page_size': 2})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.props[1].id, self.props[2].id])
+        response = APIClient().get(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [self.props[0].id])
+        self.assertEqual(APIClient().get(reverse('property-list-create'), {'ordering': 'price'}).status_code, 400)
+
+    def test_sync_increments_instead_of_recounting(self):
+        # Counts move by the rows actually inserted, on top of whatever
+        # concurrent writers did, rather than being overwritten.
+        Property.objects.filter(pk=self.props[1].pk).update(favorites_count=5)
+        Favorite.objects.create(user=self.buyers[0], property=self.props[0])
+        client = APIClient()
+        client.force_authenticate(self.buyers[0])
+        client.post(reverse('sync_favorites'), {'add': [self.props[0].id, self.props[1].id]}, format='json')
+        self.assertEqual([self.count(prop) for prop in self.props], [1, 6, 0])
+
+    def test_sync_racing_another_write(self):
+        def raced(objs, **kwargs):
+            raise IntegrityError('UNIQUE constraint failed')
+
+        client = APIClient()
+        client.force_authenticate(self.buyers[0])
+        with mock.patch.object(Favorite.objects, 'bulk_create', side_effect=raced):
+            client.post(reverse('sync_favorites'), {'add': [self.props[0].id, self.props[1].id]}, format='json')
+        self.assertEqual([self.count(prop) for prop in self.props], [1, 1, 0])
+        self.assertEqual(Favorite.objects.filter(user=self.buyers[0]).count(), 2)
+
+    def test_removals_count_each_deleted_row_once(self):
+        for buyer in self.buyers[:2]:
+            Favorite.objects.create(user=buyer, property=self.props[0])
+        self.assertEqual(remove_favorites(self.buyers[0], [self.props[0].id]), [self.props[0].id])
+        # A second removal of the same favorite, e.g. a retried request,
+        # deletes nothing and must not count again.
+        self.assertEqual(remove_favorites(self.buyers[0], [self.props[0].id]), [])
+        self.assertEqual(self.count(self.props[0]), 1)
+
+        client = APIClient()
+        client.force_authenticate(self.buyers[0])
+        response = client.delete(reverse('remove_favorite'), {'property': self.props[0].id}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.count(self.props[0]), 1)
+
+    def test_deleting_a_user_uncounts_their_favorites(self):
+        for prop in self.props[:2]:
+            Favorite.objects.create(user=self.buyers[0], property=prop)
+        Favorite.objects.create(user=self.buyers[1], property=self.props[0])
+        self.buyers[0].delete()
+        self.assertEqual([self.count(prop) for prop in self.props], [1, 0, 0])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_count_changes_fail_conditional_requests(self):
+        get_cache().clear()
+        client = APIClient()
+        params = {'ordering': 'popular', 'fields': 'card'}
+        list_etag = client.get(reverse('property-list-create'), params)['ETag']
+        detail_url = reverse('property-detail', args=[self.props[2].id])
+        detail_etag = client.get(detail_url)['ETag']
+        client.get(reverse('property-list-create'))
+        updated_at = Property.objects.get(pk=self.props[2].pk).updated_at
+
+        Favorite.objects.create(user=self.buyers[0], property=self.props[2])
+        self.assertEqual(Property.objects.get(pk=self.props[2].pk).updated_at, updated_at)
+        # Only the popularity rankings and the listing itself are invalidated.
+        self.assertEqual(client.get(reverse('property-list-create'))['X-Cache'], 'HIT')
+        response = client.get(reverse('property-list-create'), params, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['id'], self.props[2].id)
+        self.assertEqual(response.data['results'][0]['favorites_count'], 1)
+        self.assertEqual(client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
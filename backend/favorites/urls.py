@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import list_favorites, add_favorite, remove_favorite
+from .views import list_favorites, favorite_ids, add_favorite, remove_favorite, sync_favorites
 
 urlpatterns = [
     path('', list_favorites, name='list_favorites'),
+    path('ids/', favorite_ids, name='favorite_ids'),
     path('add/', add_favorite, name='add_favorite'),
     path('remove/', remove_favorite, name='remove_favorite'),
+    path('sync/', sync_favorites, name='sync_favorites'),
 ]
@@ -1,24 +1,65 @@
 # favorites/views.py
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import IntegrityError, transaction
 from .models import Favorite
-from .serializers import FavoriteSerializer
+from .serializers import FavoriteSerializer, FavoriteSyncSerializer
+from .cache import favorite_property_ids, invalidate_favorite_ids
+from .counters import adjust_favorites_count, remove_favorites
+from .pagination import FavoriteCursorPagination
 from properties.models import Property
+from properties.fast_serializers import fields_from_request, property_columns, serialize_properties
+from properties.renderers import ORJSONRenderer
+from real_state.throttling import scoped_throttles
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer, BrowsableAPIRenderer])
 def list_favorites(request):
-    favorites = Favorite.objects.filter(user=request.user)
-    serializer = FavoriteSerializer(favorites, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    fields = fields_from_request(request.query_params)
+    queryset = (
+        Favorite.objects.filter(user=request.user)
+        .values('id', 'user_id', *property_columns('property__', fields))
+    )
+    paginator = FavoriteCursorPagination()
+    rows = paginator.paginate_queryset(queryset, request)
+    properties = serialize_properties(rows, prefix='property__', fields=fields)
+    data = [
+        {'id': row['id'], 'property': prop, 'user': row['user_id']}
+        for row, prop in zip(rows, properties)
+    ]
+    return paginator.get_paginated_response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer, BrowsableAPIRenderer])
+def favorite_ids(request):
+    """
+    The ids of the user's favorited listings, newest first. With
+    `?property_ids=1,2,3` (e.g. a page of search results) it answers
+    membership for just those ids instead.
+    """
+    property_ids = favorite_property_ids(request.user.id)
+    requested = request.query_params.get('property_ids')
+    if requested is None:
+        return Response({'ids': property_ids})
+
+    try:
+        requested = [int(value) for value in requested.split(',') if value.strip()]
+    except ValueError:
+        return Response({"error": "property_ids must be comma separated integers."}, status=status.HTTP_400_BAD_REQUEST)
+    favorited = set(property_ids)
+    return Response({'favorited': {str(pk): pk in favorited for pk in requested}})
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
- 
+@throttle_classes(scoped_throttles('favorite'))
 def add_favorite(request):
     print("Authorization Header:", request.headers.get("Authorization"))
     property_id = request.data.get('property')
@@ -66,15 +107,57 @@ def remove_favorite(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    try:
-        favorite = Favorite.objects.get(user=request.user, property_id=property_id)
-        favorite.delete()
+    if remove_favorites(request.user, [property_id]):
         return Response(
             {"message": "Removed from favorites"},
             status=status.HTTP_204_NO_CONTENT
         )
-    except Favorite.DoesNotExist:
-        return Response(
-            {"error": "Favorite not found"},
-            status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+    return Response(
+        {"error": "Favorite not found"},
+        status=status.HTTP_404_NOT_FOUND
+    )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([ORJSONRenderer, BrowsableAPIRenderer])
+@throttle_classes(scoped_throttles('favorite'))
+def sync_favorites(request):
+    """
+    Apply a batch of hearts and un-hearts, e.g. queued while offline.
+    Body: {"add": [1, 2], "remove": [3]}; an id in both lists is removed.
+    Replaying a batch, or two batches racing, converges on the same set.
+    Returns the user's favorite ids afterwards and any unknown ids.
+    """
+    serializer = FavoriteSyncSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    remove = set(serializer.validated_data['remove'])
+    add = set(serializer.validated_data['add']) - remove
+
+    existing = set(Property.objects.filter(pk__in=add).values_list('id', flat=True))
+    with transaction.atomic():
+        if remove:
+            remove_favorites(request.user, remove)
+        already = set(
+            Favorite.objects.filter(user=request.user, property_id__in=existing)
+            .values_list('property_id', flat=True)
+        )
+        new = sorted(existing - already)
+        if new:
+            try:
+                with transaction.atomic():
+                    Favorite.objects.bulk_create([Favorite(user=request.user, property_id=pk) for pk in new])
+            except IntegrityError:
+                # A concurrent request saved one of them first; add them one
+                # by one, letting the post_save signal count each new row.
+                for pk in new:
+                    Favorite.objects.get_or_create(user=request.user, property_id=pk)
+            else:
+                # bulk_create sends no post_save signal.
+                invalidate_favorite_ids(request.user.id)
+                adjust_favorites_count(new, 1)
+
+    return Response({
+        'ids': favorite_property_ids(request.user.id),
+        'unknown': sorted(add - existing),
+    }, status=status.HTTP_200_OK)
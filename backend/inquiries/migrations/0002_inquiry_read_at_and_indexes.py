@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0001_initial'),
+        ('properties', '0013_property_favorites_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inquiry',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='inquiry',
+            index=models.Index(fields=['property', '-created_at', '-id'], name='inquiry_property_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inquiry',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='inquiry_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inquiry',
+            index=models.Index(fields=['-created_at', '-id'], name='inquiry_recent_idx'),
+        ),
+    ]
@@ -11,6 +11,16 @@ class Inquiry(models.Model):
     message = models.TextField()
     contact_number = models.CharField(max_length=20)
     created_at = models.DateTimeField(auto_now_add=True)
+    # When the listing's owner opened it; null while unread.
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Inboxes are read newest first, per listing (sellers) or per sender (buyers).
+        indexes = [
+            models.Index(fields=['property', '-created_at', '-id'], name='inquiry_property_recent_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='inquiry_user_recent_idx'),
+            models.Index(fields=['-created_at', '-id'], name='inquiry_recent_idx'),
+        ]
 
 # This model represents an inquiry made by a user about a property.
     def __str__(self):
@@ -0,0 +1,5 @@
+from properties.pagination import KeysetCursorPagination
+
+
+class InquiryCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at', '-id')
@@ -5,4 +5,14 @@ class InquirySerializer(serializers.ModelSerializer):
     class Meta:
         model = Inquiry
         fields = '__all__'
-        read_only_fields = ['user']
+        read_only_fields = ['user', 'read_at']
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=1000)
+    property = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        if 'ids' not in data and 'property' not in data:
+            raise serializers.ValidationError('Give the inquiry ids or a property to mark as read.')
+        return data
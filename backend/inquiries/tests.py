@@ -1,3 +1,58 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import CustomUser
+from properties.tests import create_property
+from .models import Inquiry
+
+
+class InquiryInboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = CustomUser.objects.create_user('seller@example.com', 'secret123', role='seller')
+        other_seller = CustomUser.objects.create_user('other@example.com', 'secret123', role='seller')
+        cls.buyer = CustomUser.objects.create_user('buyer@example.com', 'secret123', role='buyer')
+        cls.first, cls.second = create_property(cls.seller, 0), create_property(cls.seller, 1)
+        foreign = create_property(other_seller, 2)
+        cls.inquiries = [
+            Inquiry.objects.create(user=cls.buyer, property=prop, message=f'Hello {index}', contact_number='0171')
+            for index, prop in enumerate([cls.first, cls.first, cls.second, foreign])
+        ]
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_inbox_is_newest_first_and_paginated(self):
+        client = self.client_for(self.seller)
+        response = client.get(reverse('inquiry-list'), {'page_size': 2})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.inquiries[2].id, self.inquiries[1].id])
+        response = client.get(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [self.inquiries[0].id])
+
+    def test_unread_counts_in_one_query(self):
+        client = self.client_for(self.seller)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('inquiry-unread-counts'))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.data, {
+            'total': 3,
+            'properties': [{'property': self.first.id, 'unread': 2}, {'property': self.second.id, 'unread': 1}],
+        })
+
+    def test_mark_read(self):
+        client = self.client_for(self.seller)
+        response = client.post(reverse('inquiry-mark-read'), {'property': self.first.id}, format='json')
+        self.assertEqual(response.data['marked'], 2)
+        # Inquiries on someone else's listing are left alone.
+        response = client.post(reverse('inquiry-mark-read'), {'ids': [self.inquiries[3].id]}, format='json')
+        self.assertEqual(response.data['marked'], 0)
+
+        response = client.get(reverse('inquiry-list'), {'unread': 'true'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.inquiries[2].id])
+        self.assertEqual(client.get(reverse('inquiry-unread-counts')).data['total'], 1)
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import InquiryCreateView, InquiryListView
+from .views import InquiryCreateView, InquiryListView, UnreadInquiryCountView, MarkInquiriesReadView
 
 urlpatterns = [
     path('create/', InquiryCreateView.as_view(), name='inquiry-create'),
     path('', InquiryListView.as_view(), name='inquiry-list'),
+    path('unread-counts/', UnreadInquiryCountView.as_view(), name='inquiry-unread-counts'),
+    path('mark-read/', MarkInquiriesReadView.as_view(), name='inquiry-mark-read'),
 ]
@@ -1,40 +1,111 @@
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import InquirySerializer
+from .serializers import InquirySerializer, MarkReadSerializer
 from .models import Inquiry  # ⬅️ এই লাইনটা লাগবে GET এর জন্য
+from .pagination import InquiryCursorPagination
+from notifications.outbox import record_inquiry
+from real_state.throttling import scoped_throttles
 
 # ✅ POST: Inquiry Create
 class InquiryCreateView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = scoped_throttles('inquiry')
 
     def post(self, request):
         serializer = InquirySerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            # The seller is emailed later from the outbox, which commits
+            # together with the inquiry.
+            with transaction.atomic():
+                inquiry = serializer.save(user=request.user)
+                record_inquiry(inquiry)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-# ✅ GET: Inquiry List (based on role)
+def received_inquiries(user):
+    """Inquiries the user may read as an inbox, or None if the role has none."""
+    if user.role in ['superadmin', 'admin']:
+        return Inquiry.objects.all()
+    if user.role == 'seller':
+        return Inquiry.objects.filter(property__owner=user)
+    if user.role == 'buyer':
+        return Inquiry.objects.filter(user=user)
+    return None
+
+
+# ✅ GET: Inquiry inbox (based on role), newest first
 class InquiryListView(APIView):
+    """
+    GET: Inquiries newest first, cursor-paginated. Sellers see those on their
+    listings, buyers those they sent, admins all. Filter with `?unread=true`
+    and `?property=<id>`.
+    """
     permission_classes = [IsAuthenticated]
+    pagination_class = InquiryCursorPagination
 
     def get(self, request):
-        user = request.user
+        inquiries = received_inquiries(request.user)
+        if inquiries is None:
+            return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
 
-        if user.role in ['superadmin', 'admin']:
-            inquiries = Inquiry.objects.all()
+        if request.query_params.get('unread') in ('1', 'true'):
+            inquiries = inquiries.filter(read_at__isnull=True)
+        property_id = request.query_params.get('property')
+        if property_id:
+            if not property_id.isdigit():
+                return Response({"error": "property must be an id"}, status=status.HTTP_400_BAD_REQUEST)
+            inquiries = inquiries.filter(property_id=property_id)
 
-        elif user.role == 'seller':
-            inquiries = Inquiry.objects.filter(property__owner=user)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(inquiries, request, view=self)
+        serializer = InquirySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
-        elif user.role == 'buyer':
-            inquiries = Inquiry.objects.filter(user=user)
 
-        else:
+class UnreadInquiryCountView(APIView):
+    """
+    GET: Unread inquiries per listing, in one grouped query:
+    {"total": 5, "properties": [{"property": 3, "unread": 4}, ...]}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        inquiries = received_inquiries(request.user)
+        if inquiries is None:
             return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer = InquirySerializer(inquiries, many=True)
-        return Response(serializer.data)
+        counts = list(
+            inquiries.filter(read_at__isnull=True)
+            .values('property')
+            .annotate(unread=Count('id'))
+            .order_by('-unread', 'property')
+        )
+        return Response({
+            'total': sum(row['unread'] for row in counts),
+            'properties': counts,
+        })
+
+
+class MarkInquiriesReadView(APIView):
+    """
+    POST: Mark inquiries on the caller's listings as read, by id
+    ({"ids": [1, 2]}) or for a whole listing ({"property": 3}), in one UPDATE.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        inquiries = Inquiry.objects.filter(property__owner=request.user, read_at__isnull=True)
+        if 'ids' in serializer.validated_data:
+            inquiries = inquiries.filter(pk__in=serializer.validated_data['ids'])
+        if 'property' in serializer.validated_data:
+            inquiries = inquiries.filter(property_id=serializer.validated_data['property'])
+        return Response({'marked': inquiries.update(read_at=timezone.now())})
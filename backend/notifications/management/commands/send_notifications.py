@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import drain
+
+
+class Command(BaseCommand):
+    help = 'Email pending outbox notifications, as one digest per seller per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events claimed per batch.')
+        parser.add_argument('--once', action='store_true', help='Exit when the outbox is empty instead of polling.')
+        parser.add_argument('--sleep', type=float, default=10.0, help='Seconds between polls when idle.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} notifications, {failed} failed.')
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    A notification waiting to be emailed. Rows are written in the same
+    transaction as the change they announce and sent later by
+    `manage.py send_notifications`, so a request never waits on SMTP and a
+    rolled-back change never notifies anyone.
+    """
+    INQUIRY_CREATED = 'inquiry_created'
+    PROPERTY_APPROVED = 'property_approved'
+    PROPERTY_REJECTED = 'property_rejected'
+    KIND_CHOICES = [
+        (INQUIRY_CREATED, 'Inquiry created'),
+        (PROPERTY_APPROVED, 'Property approved'),
+        (PROPERTY_REJECTED, 'Property rejected'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='outbox_events')
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker only ever reads unsent rows, oldest first.
+            models.Index(
+                fields=['created_at', 'id'], name='outbox_unsent_idx',
+                condition=models.Q(sent_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.recipient_id}"
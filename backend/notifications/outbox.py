@@ -0,0 +1,129 @@
+"""
+Transactional outbox for seller notifications.
+
+`record_*` add OutboxEvent rows inside the caller's transaction. `drain`
+sends them in batches: events for the same seller become one digest email,
+and every email of a run goes over a single SMTP connection. Rows are
+locked (SKIP LOCKED) while their batch is sent, so concurrent workers split
+the work; a crash between sending and committing re-sends the batch, i.e.
+delivery is at least once.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+MESSAGE_PREVIEW_LENGTH = 200
+
+
+def record_inquiry(inquiry):
+    """Queue a notification to the listing's owner about a new inquiry."""
+    prop = inquiry.property
+    return OutboxEvent.objects.create(
+        kind=OutboxEvent.INQUIRY_CREATED,
+        recipient_id=prop.owner_id,
+        payload={
+            'inquiry_id': inquiry.pk,
+            'property_id': prop.pk,
+            'property_title': prop.title,
+            'from': inquiry.user.email,
+            'contact_number': inquiry.contact_number,
+            'message': inquiry.message[:MESSAGE_PREVIEW_LENGTH],
+        },
+    )
+
+
+def record_moderation(properties, approved):
+    """Queue a notification to each owner of `properties` about a moderation decision."""
+    kind = OutboxEvent.PROPERTY_APPROVED if approved else OutboxEvent.PROPERTY_REJECTED
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            kind=kind,
+            recipient_id=prop.owner_id,
+            payload={'property_id': prop.pk, 'property_title': prop.title},
+        )
+        for prop in properties
+    ])
+
+
+def describe(event):
+    payload = event.payload
+    if event.kind == OutboxEvent.INQUIRY_CREATED:
+        return (
+            f"New inquiry on \"{payload['property_title']}\" from {payload['from']} "
+            f"({payload['contact_number']}):\n{payload['message']}"
+        )
+    decision = 'approved and published' if event.kind == OutboxEvent.PROPERTY_APPROVED else 'rejected'
+    return f"Your listing \"{payload['property_title']}\" was {decision}."
+
+
+def digest(recipient, events):
+    """One email summarising all of a seller's pending events."""
+    inquiries = sum(event.kind == OutboxEvent.INQUIRY_CREATED for event in events)
+    if len(events) == 1:
+        subject = describe(events[0]).split('\n')[0]
+    elif inquiries == len(events):
+        subject = f'{inquiries} new inquiries on your listings'
+    else:
+        subject = f'{len(events)} updates on your listings'
+    body = '\n\n'.join(describe(event) for event in events)
+    return EmailMessage(subject=subject, body=body, to=[recipient.email])
+
+
+def send_batch(connection, limit, skip=()):
+    """
+    Send up to `limit` due events, other than the ids in `skip`, as
+    per-recipient digests over `connection`. Returns the sent and the failed
+    events; both are empty once nothing is due.
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .select_related('recipient')
+            .filter(sent_at__isnull=True, attempts__lt=settings.NOTIFICATION_MAX_ATTEMPTS)
+            .exclude(pk__in=skip)
+            .order_by('created_at', 'id')[:limit]
+        )
+        by_recipient = defaultdict(list)
+        for event in events:
+            by_recipient[event.recipient].append(event)
+
+        sent, failed = [], []
+        for recipient, recipient_events in by_recipient.items():
+            try:
+                connection.send_messages([digest(recipient, recipient_events)])
+            except Exception as exc:
+                for event in recipient_events:
+                    event.attempts += 1
+                    event.last_error = f'{type(exc).__name__}: {exc}'
+                failed += recipient_events
+            else:
+                sent += recipient_events
+
+        if sent:
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in sent]).update(sent_at=timezone.now())
+        if failed:
+            OutboxEvent.objects.bulk_update(failed, ['attempts', 'last_error'])
+    return sent, failed
+
+
+def drain(batch_size=100, connection=None):
+    """Send every due event, reusing one connection. Returns `(sent, failed)` counts."""
+    connection = connection or get_connection()
+    sent = 0
+    failed = []
+    connection.open()
+    try:
+        while True:
+            # Events that failed in this run wait for the next one.
+            batch_sent, batch_failed = send_batch(connection, batch_size, skip=[event.pk for event in failed])
+            if not batch_sent and not batch_failed:
+                return sent, len(failed)
+            sent += len(batch_sent)
+            failed += batch_failed
+    finally:
+        connection.close()
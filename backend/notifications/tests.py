@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from properties.models import Property
+from properties.tests import create_property
+from .models import OutboxEvent
+from .outbox import drain, record_moderation
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend that counts connections and can be told to fail for a recipient."""
+    opened = 0
+    fail_for = None
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if any(self.fail_for in message.to for message in messages):
+            raise ConnectionError('mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='notifications.tests.CountingBackend')
+class OutboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sellers = [
+            CustomUser.objects.create_user(f'seller{index}@example.com', 'secret123', role='seller')
+            for index in range(2)
+        ]
+        cls.buyer = CustomUser.objects.create_user('buyer@example.com', 'secret123', role='buyer')
+        cls.admin = CustomUser.objects.create_user('admin@example.com', 'secret123', role='admin')
+        cls.props = [create_property(seller, index) for index, seller in enumerate(cls.sellers)]
+        cls.props.append(create_property(cls.sellers[0], 2))
+
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.fail_for = None
+
+    def inquire(self, prop):
+        client = APIClient()
+        client.force_authenticate(self.buyer)
+        response = client.post(reverse('inquiry-create'), {
+            'property': prop.id, 'message': 'Is it still available?', 'contact_number': '01700000000',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_inquiry_is_queued_not_sent(self):
+        self.inquire(self.props[0])
+        self.assertEqual(mail.outbox, [])
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.recipient, self.sellers[0])
+        self.assertEqual(event.payload['from'], 'buyer@example.com')
+
+    def test_digest_per_seller_over_one_connection(self):
+        self.inquire(self.props[0])
+        self.inquire(self.props[2])
+        self.inquire(self.props[1])
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        client.post(reverse('property-bulk-moderation'), {'ids': [self.props[0].id], 'action': 'approve'}, format='json')
+
+        out = StringIO()
+        call_command('send_notifications', '--once', '--batch-size', '2', stdout=out)
+        self.assertIn('Sent 4 notifications, 0 failed', out.getvalue())
+        self.assertEqual(CountingBackend.opened, 1)
+        # Batches of two: seller0 gets two inquiries, then seller1's inquiry
+        # and seller0's approval go out as separate digests.
+        self.assertEqual(sorted((message.to[0], message.subject) for message in mail.outbox), [
+            ('seller0@example.com', '2 new inquiries on your listings'),
+            ('seller0@example.com', 'Your listing "Property 0" was approved and published.'),
+            ('seller1@example.com', 'New inquiry on "Property 1" from buyer@example.com (01700000000):'),
+        ])
+        self.assertFalse(OutboxEvent.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(drain(), (0, 0))
+
+    def test_failed_recipient_is_retried_later(self):
+        self.inquire(self.props[0])
+        self.inquire(self.props[1])
+        CountingBackend.fail_for = 'seller0@example.com'
+        self.assertEqual(drain(), (1, 1))
+        event = OutboxEvent.objects.get(sent_at__isnull=True)
+        self.assertEqual((event.attempts, event.recipient), (1, self.sellers[0]))
+
+        CountingBackend.fail_for = None
+        self.assertEqual(drain(), (1, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_rolled_back_change_queues_nothing(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            record_moderation([self.props[0]], approved=True)
+            raise RuntimeError('approval failed')
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_repeated_decision_notifies_once(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = reverse('SellerPropertyApprove', args=[self.props[0].id])
+        for _ in range(2):
+            self.assertEqual(client.post(url, {'action': 'approve'}, format='json').status_code, 200)
+        self.assertEqual(OutboxEvent.objects.filter(kind=OutboxEvent.PROPERTY_APPROVED).count(), 1)
+
+        client.post(url, {'action': 'reject'}, format='json')
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+        self.assertEqual(client.post(reverse('SellerPropertyApprove', args=[999999]), {'action': 'reject'}).status_code, 404)
+
+        client.force_authenticate(self.sellers[0])
+        self.assertEqual(client.post(url, {'action': 'approve'}, format='json').status_code, 403)
+
+    def test_status_edit_is_a_moderation_decision(self):
+        Property.objects.filter(pk=self.props[0].pk).update(claimed_by=self.admin, claim_expires_at=timezone.now())
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = reverse('property-detail', args=[self.props[0].id])
+        response = client.patch(url, {'status': Property.APPROVED, 'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['title'], response.data['is_published']), ('Renamed', True))
+        prop = Property.objects.get(pk=self.props[0].pk)
+        self.assertEqual(prop.status, Property.APPROVED)
+        self.assertIsNone(prop.claimed_by_id)
+        event = OutboxEvent.objects.get()
+        self.assertEqual((event.kind, event.recipient), (OutboxEvent.PROPERTY_APPROVED, self.sellers[0]))
+
+        # Repeating the status notifies nobody; sellers may send it unchanged
+        # with their edits but not change it.
+        client.patch(url, {'status': Property.APPROVED, 'price': '999.00'}, format='json')
+        client.force_authenticate(self.sellers[1])
+        other = reverse('property-detail', args=[self.props[1].id])
+        self.assertEqual(client.patch(other, {'status': Property.PENDING, 'title': 'Mine'}, format='json').status_code, 200)
+        self.assertEqual(client.patch(other, {'status': Property.APPROVED}, format='json').status_code, 403)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+        self.assertEqual(Property.objects.get(pk=self.props[1].pk).status, Property.PENDING)
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+LIST_TAG = 'properties:list'
+# Responses ranked by favorites_count (`ordering=popular`, most saved).
+POPULARITY_TAG = 'properties:popularity'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def property_tag(property_id):
+    return f'property:{property_id}'
+
+
+def get_cache():
+    return caches[settings.PROPERTY_CACHE_ALIAS]
+
+
+def normalize_query_params(query_params, exclude=()):
+    """
+    Return the request's query parameters as a sorted list of pairs, without
+    blank values or the keys in `exclude`, so equivalent requests share a key.
+    """
+    pairs = []
+    for key in sorted(query_params.keys()):
+        if key in exclude:
+            continue
+        for value in sorted(query_params.getlist(key)):
+            if value.strip():
+                pairs.append((key, value.strip()))
+    return pairs
+
+
+def make_cache_key(prefix, pairs):
+    digest = hashlib.sha1(urlencode(pairs).encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def get_tag_versions(tags):
+    """
+    Return the current version of each tag, initialising missing ones.
+
+    A missing version (never set, or evicted) starts from the clock rather
+    than from 1, so it can never match a key written under an older version.
+    """
+    cache = get_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Bump the version of each tag, orphaning every entry stored under it."""
+    cache = get_cache()
+    for tag in tags:
+        try:
+            cache.incr(_tag_key(tag))
+        except ValueError:
+            cache.set(_tag_key(tag), time.time_ns(), timeout=None)
+
+
+def invalidate_properties(*property_ids):
+    """Drop cached list pages and the detail entries of the given listings."""
+    invalidate_tags(LIST_TAG, *[property_tag(pk) for pk in property_ids])
+
+
+def invalidate_tags_on_write(*tags):
+    """
+    Invalidate after a write: right away, so the writing request reads its
+    own writes, and again after commit, so a concurrent read of the old rows
+    cannot re-cache them.
+    """
+    invalidate_tags(*tags)
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def invalidate_properties_on_write(*property_ids):
+    """`invalidate_properties` after writing listings."""
+    invalidate_tags_on_write(LIST_TAG, *[property_tag(pk) for pk in property_ids])
+
+
+def invalidate_popularity_on_write(*property_ids):
+    """
+    Invalidate after changing favorite counts: the listings' own entries and
+    the popularity rankings. Other list pages keep their entries and show
+    the old counts until they expire.
+    """
+    invalidate_tags_on_write(POPULARITY_TAG, *[property_tag(pk) for pk in property_ids])
+
+
+def cached(prefix, tags, pairs, compute, timeout=None):
+    """
+    Return `(value, hit)` for the entry identified by `prefix` and `pairs`,
+    calling `compute()` and storing its result on a miss. The entry is valid
+    as long as none of `tags` has been invalidated since it was written.
+    """
+    cache = get_cache()
+    versions = get_tag_versions(tags)
+    key = make_cache_key(prefix, list(zip(tags, map(str, versions))) + list(pairs))
+    value = cache.get(key)
+    hit = value is not None
+    if not hit:
+        value = compute()
+        cache.set(key, value, settings.PROPERTY_CACHE_TIMEOUT if timeout is None else timeout)
+    with _stats_lock:
+        _stats[prefix, 'hits' if hit else 'misses'] += 1
+    return value, hit
+
+
+def get_stats():
+    """Hit and miss counters of this process, per cache prefix."""
+    stats = {}
+    with _stats_lock:
+        for (prefix, outcome), count in _stats.items():
+            stats.setdefault(prefix, {'hits': 0, 'misses': 0})[outcome] = count
+    return stats
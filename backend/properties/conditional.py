@@ -0,0 +1,54 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def list_validators(queryset, pairs):
+    """
+    ETag and Last-Modified for a filtered listing, from one aggregate query:
+    the newest `updated_at` catches edits and additions, the count catches
+    deletions, and the total of `favorites_count` (which does not touch
+    `updated_at`) catches saves. Returns `(etag, last_modified)` with a Unix
+    timestamp.
+    """
+    summary = queryset.order_by().aggregate(
+        last_modified=Max('updated_at'), count=Count('id'), favorites=Sum('favorites_count'),
+    )
+    last_modified = summary['last_modified']
+    raw = f"{pairs}|{last_modified.isoformat() if last_modified else ''}|{summary['count']}|{summary['favorites']}"
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest()), _timestamp(last_modified)
+
+
+def detail_validators(queryset, property_id, pairs):
+    """
+    ETag and Last-Modified for one listing, or `None` if it does not exist.
+    The ETag also covers `favorites_count`, which does not touch `updated_at`.
+    """
+    row = queryset.filter(pk=property_id).values_list('updated_at', 'favorites_count').first()
+    if row is None:
+        return None
+    updated_at, favorites_count = row
+    raw = f'{pairs}|{property_id}|{updated_at.isoformat()}|{favorites_count}'
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest()), _timestamp(updated_at)
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 response if the client's copy is current, else `None`."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _timestamp(value):
+    return timegm(value.utctimetuple()) if value else None
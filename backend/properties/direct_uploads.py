@@ -0,0 +1,70 @@
+"""
+Signed direct uploads: the browser sends photos straight to Cloudinary.
+
+`signed_upload_params` signs an upload into the listing's own folder using
+the configured API secret (no call to Cloudinary is made). After uploading,
+the client posts what Cloudinary returned to the confirm endpoint, and
+`confirmed_urls` checks each response signature before the URLs are stored.
+"""
+import time
+
+import cloudinary
+from cloudinary.utils import api_sign_request, cloudinary_url, verify_api_response_signature
+
+# Cloudinary refuses signed uploads whose timestamp is older than an hour.
+SIGNATURE_TTL_SECONDS = 3600
+ALLOWED_FORMATS = 'jpg,jpeg,png,webp'
+
+
+class DirectUploadsUnavailable(Exception):
+    pass
+
+
+def upload_folder(property_id):
+    return f'properties/{property_id}'
+
+
+def _config():
+    config = cloudinary.config()
+    if not (config.cloud_name and config.api_key and config.api_secret):
+        raise DirectUploadsUnavailable('Cloudinary credentials are not configured.')
+    return config
+
+
+def signed_upload_params(property_id):
+    """The upload URL and the signed form fields for one upload session."""
+    config = _config()
+    timestamp = int(time.time())
+    params = {
+        'folder': upload_folder(property_id),
+        'timestamp': timestamp,
+        'allowed_formats': ALLOWED_FORMATS,
+    }
+    params['signature'] = api_sign_request(params, config.api_secret, config.signature_algorithm or 'sha1')
+    params['api_key'] = config.api_key
+    return {
+        'upload_url': f'https://api.cloudinary.com/v1_1/{config.cloud_name}/image/upload',
+        'params': params,
+        'expires_at': timestamp + SIGNATURE_TTL_SECONDS,
+    }
+
+
+def confirmed_urls(property_id, uploads):
+    """
+    Return the delivery URL of each upload, in order, after checking that
+    Cloudinary signed its response and that it landed in this listing's
+    folder. Returns `(urls, errors)`, errors keyed by position.
+    """
+    _config()
+    folder = upload_folder(property_id) + '/'
+    urls, errors = [], {}
+    for index, upload in enumerate(uploads):
+        public_id, version = upload['public_id'], upload['version']
+        if not public_id.startswith(folder):
+            errors[index] = 'Upload does not belong to this property.'
+        elif not verify_api_response_signature(public_id, version, upload['signature']):
+            errors[index] = 'Invalid upload signature.'
+        else:
+            url, _ = cloudinary_url(public_id, version=version, format=upload['format'], secure=True)
+            urls.append(url)
+    return urls, errors
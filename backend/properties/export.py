@@ -0,0 +1,74 @@
+import csv
+import datetime
+import io
+import json
+from itertools import islice
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .fast_serializers import FIELDS, property_values, serialize_properties
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+CSV_IMAGE_SEPARATOR = ' '
+
+
+def parse_updated_since(value):
+    """Parse an ISO 8601 datetime (naive values are taken as UTC), or return None."""
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        return None
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since, datetime.timezone.utc)
+    return since
+
+
+def export_batches(queryset, chunk_size=500):
+    """
+    Yield serialized listings in batches of `chunk_size`.
+
+    Rows are streamed from a server-side cursor with `iterator()`, and each
+    batch fetches its own images in one query, so memory stays flat however
+    large the table is.
+    """
+    rows = property_values(queryset).order_by('id').iterator(chunk_size=chunk_size)
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            return
+        yield serialize_properties(batch)
+
+
+def ndjson_lines(batches):
+    for batch in batches:
+        if orjson is not None:
+            yield b''.join(orjson.dumps(row) + b'\n' for row in batch)
+        else:
+            yield ''.join(json.dumps(row) + '\n' for row in batch).encode()
+
+
+def csv_lines(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for batch in batches:
+        for row in batch:
+            images = CSV_IMAGE_SEPARATOR.join(image['image'] for image in row['images'] if image['image'])
+            writer.writerow([images if field == 'images' else row[field] for field in FIELDS])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def export_stream(queryset, output, chunk_size=500):
+    batches = export_batches(queryset, chunk_size)
+    return ndjson_lines(batches) if output == 'ndjson' else csv_lines(batches)
@@ -0,0 +1,57 @@
+from django.db.models import Count, Q
+
+from .models import Property
+
+BEDROOM_BUCKETS = [
+    ('1', Q(bedrooms__lte=1)),
+    ('2', Q(bedrooms=2)),
+    ('3', Q(bedrooms=3)),
+    ('4', Q(bedrooms=4)),
+    ('5+', Q(bedrooms__gte=5)),
+]
+
+PRICE_BANDS = [
+    ('0-50000', Q(price__lt=50000)),
+    ('50000-100000', Q(price__gte=50000, price__lt=100000)),
+    ('100000-250000', Q(price__gte=100000, price__lt=250000)),
+    ('250000-500000', Q(price__gte=250000, price__lt=500000)),
+    ('500000+', Q(price__gte=500000)),
+]
+
+
+def compute_facets(queryset):
+    """
+    Count the filtered listings per property type, purpose, bedroom bucket and
+    price band in a single query.
+
+    `property_type` is free text, so the query groups by it; the other facets
+    have known values and are conditional counts on each group, summed here.
+    """
+    conditional = {}
+    for value, _ in Property.PURPOSE_CHOICES:
+        conditional[('purpose', value)] = Count('id', filter=Q(purpose=value))
+    for label, condition in BEDROOM_BUCKETS:
+        conditional[('bedrooms', label)] = Count('id', filter=condition)
+    for label, condition in PRICE_BANDS:
+        conditional[('price', label)] = Count('id', filter=condition)
+
+    aliases = {f'facet_{index}': key for index, key in enumerate(conditional)}
+    rows = (
+        queryset.order_by()
+        .values('property_type')
+        .annotate(total=Count('id'), **{alias: conditional[key] for alias, key in aliases.items()})
+    )
+
+    facets = {
+        'total': 0,
+        'property_type': {},
+        'purpose': {value: 0 for value, _ in Property.PURPOSE_CHOICES},
+        'bedrooms': {label: 0 for label, _ in BEDROOM_BUCKETS},
+        'price': {label: 0 for label, _ in PRICE_BANDS},
+    }
+    for row in rows:
+        facets['total'] += row['total']
+        facets['property_type'][row['property_type']] = row['total']
+        for alias, (facet, value) in aliases.items():
+            facets[facet][value] += row[alias]
+    return facets
@@ -0,0 +1,152 @@
+"""
+Read-only serialization of listings straight from `values()` rows.
+
+`PropertySerializer` builds a model instance and walks DRF's field machinery
+for every row. The list endpoints only read, so they build the same JSON
+shape here from plain dicts: one query for the listings (owner joined in) and
+one for their images. Output must stay identical to `PropertySerializer`.
+
+Clients may ask for a subset of fields (`?fields=card`, `?exclude=description`);
+only the columns behind those fields are selected, and images are only
+fetched when requested.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import PropertyImage
+
+# Output field -> column read through values().
+COLUMNS = {
+    'id': 'id',
+    'owner': 'owner__email',
+    'title': 'title',
+    'description': 'description',
+    'price': 'price',
+    'location': 'location',
+    'bedrooms': 'bedrooms',
+    'bathrooms': 'bathrooms',
+    'space': 'space',
+    'property_type': 'property_type',
+    'purpose': 'purpose',
+    'is_published': 'is_published',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'cover_image': 'cover_image',
+    'favorites_count': 'favorites_count',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+FIELDS = list(COLUMNS) + ['images']
+IMAGE_FIELDS = ['id', 'image', 'status', 'position', 'thumbnail_url', 'medium_url', 'large_url']
+
+PRESETS = {
+    'card': ['id', 'title', 'price', 'location', 'bedrooms', 'cover_image', 'favorites_count'],
+    'full': FIELDS,
+}
+
+# Always selected so rows can be identified and cursor-paginated in any
+# of the PropertyCursorPagination orderings.
+REQUIRED_COLUMNS = ['id', 'created_at', 'favorites_count']
+
+
+def _decimal(places):
+    exponent = Decimal(1).scaleb(-places)
+
+    def format_decimal(value):
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        return f'{value.quantize(exponent):f}'
+    return format_decimal
+
+
+def _datetime(value):
+    value = timezone.localtime(value) if timezone.is_aware(value) else value
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+FORMATTERS = {
+    'price': _decimal(2),
+    'latitude': _decimal(6),
+    'longitude': _decimal(6),
+    'created_at': _datetime,
+    'updated_at': _datetime,
+}
+
+
+def fields_from_request(query_params):
+    """
+    Resolve `fields` and `exclude` query parameters (field names or preset
+    names, comma separated) into an ordered list of output fields.
+    """
+    fields = _expand(query_params.get('fields')) or FIELDS
+    excluded = set(_expand(query_params.get('exclude')))
+    unknown = [name for name in list(fields) + list(excluded) if name not in FIELDS]
+    if unknown:
+        raise ValidationError({'fields': f'Unknown field(s): {", ".join(unknown)}'})
+    return [name for name in fields if name not in excluded]
+
+
+def _expand(value):
+    names = []
+    for name in (value or '').split(','):
+        name = name.strip()
+        for expanded in PRESETS.get(name, [name] if name else []):
+            if expanded not in names:
+                names.append(expanded)
+    return names
+
+
+def property_columns(prefix='', fields=FIELDS):
+    """Columns to pass to `values()`; `prefix` reaches listings through a relation."""
+    columns = [COLUMNS[field] for field in fields if field in COLUMNS]
+    columns += [column for column in REQUIRED_COLUMNS if column not in columns]
+    return [prefix + column for column in columns]
+
+
+def property_values(queryset, fields=FIELDS):
+    """
+    The `values()` form of a listing queryset, selecting only what `fields`
+    needs. Annotations such as a search `rank` are kept so cursor pagination
+    can still read them.
+    """
+    annotations = list(queryset.query.annotations)
+    return queryset.prefetch_related(None).values(*property_columns(fields=fields), *annotations)
+
+
+def serialize_properties(rows, prefix='', fields=FIELDS):
+    """Turn `values()` rows into the `PropertySerializer` representation."""
+    images = images_by_property([row[prefix + 'id'] for row in rows]) if 'images' in fields else {}
+    return [serialize_property(row, images, prefix, fields) for row in rows]
+
+
+def serialize_property(row, images, prefix='', fields=FIELDS):
+    data = {}
+    for field in fields:
+        if field == 'images':
+            data[field] = images.get(row[prefix + 'id'], [])
+            continue
+        value = row[prefix + COLUMNS[field]]
+        if value is not None and field in FORMATTERS:
+            value = FORMATTERS[field](value)
+        data[field] = value
+    return data
+
+
+def images_by_property(property_ids):
+    images = defaultdict(list)
+    if not property_ids:
+        return images
+    rows = (
+        PropertyImage.objects.filter(property_id__in=property_ids)
+        .order_by('position', 'id')
+        .values_list('property_id', *IMAGE_FIELDS)
+    )
+    for property_id, *values in rows:
+        images[property_id].append(dict(zip(IMAGE_FIELDS, values)))
+    return images
@@ -0,0 +1,103 @@
+from functools import reduce
+from operator import or_
+
+import django_filters
+from django.db.models import FloatField, Q
+from django.db.models.functions import ACos, Cast, Cos, Least, Radians, Sin
+from rest_framework.exceptions import ValidationError
+
+from . import geo
+from .models import Property
+
+DEFAULT_RADIUS_KM = 5
+MAX_RADIUS_KM = 200
+
+
+class NumberCSVFilter(django_filters.BaseCSVFilter, django_filters.NumberFilter):
+    pass
+
+
+class PropertyFilter(django_filters.FilterSet):
+    """
+    Exact-match filters plus the range filters used by the search sidebar.
+    Each range is backed by an index declared on `Property.Meta`.
+
+    Map views can restrict results to a viewport with
+    `bbox=min_lat,min_lng,max_lat,max_lng` or to a circle with
+    `near=lat,lng&radius_km=5`.
+    """
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+    min_space = django_filters.NumberFilter(field_name='space', lookup_expr='gte')
+    max_space = django_filters.NumberFilter(field_name='space', lookup_expr='lte')
+    min_bedrooms = django_filters.NumberFilter(field_name='bedrooms', lookup_expr='gte')
+    bbox = NumberCSVFilter(method='filter_bbox')
+    near = NumberCSVFilter(method='filter_near')
+    radius_km = django_filters.NumberFilter(method='filter_noop')
+
+    class Meta:
+        model = Property
+        fields = [
+            'location', 'bedrooms', 'bathrooms', 'property_type', 'purpose',
+            'status', 'is_published',
+        ]
+
+    def filter_bbox(self, queryset, name, value):
+        if len(value) != 4:
+            raise ValidationError({'bbox': 'Expected min_lat,min_lng,max_lat,max_lng.'})
+        min_lat, min_lng, max_lat, max_lng = (float(v) for v in value)
+        validate_point('bbox', min_lat, min_lng)
+        validate_point('bbox', max_lat, max_lng)
+        if min_lat > max_lat or min_lng > max_lng:
+            raise ValidationError({'bbox': 'Minimum coordinates must not exceed maximum coordinates.'})
+        return filter_within_box(queryset, min_lat, min_lng, max_lat, max_lng)
+
+    def filter_near(self, queryset, name, value):
+        if len(value) != 2:
+            raise ValidationError({'near': 'Expected lat,lng.'})
+        latitude, longitude = (float(v) for v in value)
+        validate_point('near', latitude, longitude)
+        radius_km = self.form.cleaned_data.get('radius_km')
+        radius_km = DEFAULT_RADIUS_KM if radius_km is None else float(radius_km)
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            raise ValidationError({'radius_km': f'Must be greater than 0 and at most {MAX_RADIUS_KM}.'})
+        queryset = filter_within_box(queryset, *geo.bounding_box(latitude, longitude, radius_km))
+        return queryset.annotate(distance_km=distance_km(latitude, longitude)).filter(distance_km__lte=radius_km)
+
+    def filter_noop(self, queryset, name, value):
+        # Read by filter_near.
+        return queryset
+
+
+def validate_point(name, latitude, longitude):
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValidationError({name: 'Latitude must be within [-90, 90] and longitude within [-180, 180].'})
+
+
+def filter_within_box(queryset, min_lat, min_lng, max_lat, max_lng):
+    """
+    Narrow to the geohash cells covering the box (index range scans on
+    `geohash`), then trim the cell edges with the exact coordinates.
+    """
+    ranges = geo.prefix_ranges(geo.covering_cells(min_lat, min_lng, max_lat, max_lng))
+    if not ranges:
+        return queryset.none()
+    return queryset.filter(
+        reduce(or_, [
+            Q(geohash__gte=start) if end is None else Q(geohash__gte=start, geohash__lt=end)
+            for start, end in ranges
+        ]),
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    )
+
+
+def distance_km(latitude, longitude):
+    """Great-circle distance from a point, as a database expression."""
+    lat = Radians(Cast('latitude', FloatField()))
+    lng = Radians(Cast('longitude', FloatField()))
+    cosine = (
+        Cos(Radians(latitude)) * Cos(lat) * Cos(lng - Radians(longitude))
+        + Sin(Radians(latitude)) * Sin(lat)
+    )
+    return geo.EARTH_RADIUS_KM * ACos(Least(cosine, 1.0))
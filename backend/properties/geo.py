@@ -0,0 +1,115 @@
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0
+MAX_PRECISION = 9
+
+# Geohash precision used for map clusters at each web-map zoom level.
+ZOOM_PRECISION = [(2, 1), (4, 2), (7, 3), (10, 4), (12, 5), (15, 6)]
+
+
+def encode(latitude, longitude, precision=MAX_PRECISION):
+    """Encode a coordinate as a geohash string of `precision` characters."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            bounds[0] = middle
+        else:
+            bits <<= 1
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return the (height, width) of a geohash cell in degrees."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng, max_cells=32):
+    """
+    Return the geohash prefixes that together cover a bounding box, using the
+    finest precision that needs at most `max_cells` prefixes.
+    """
+    best = [encode((min_lat + max_lat) / 2, (min_lng + max_lng) / 2, 1)]
+    for precision in range(1, MAX_PRECISION + 1):
+        height, width = cell_size(precision)
+        rows = math.floor((max_lat + 90) / height) - math.floor((min_lat + 90) / height) + 1
+        cols = math.floor((max_lng + 180) / width) - math.floor((min_lng + 180) / width) + 1
+        if rows * cols > max_cells:
+            break
+        first_lat = (math.floor((min_lat + 90) / height) + 0.5) * height - 90
+        first_lng = (math.floor((min_lng + 180) / width) + 0.5) * width - 180
+        best = sorted({
+            encode(first_lat + row * height, first_lng + col * width, precision)
+            for row in range(rows)
+            for col in range(cols)
+        })
+    return best
+
+
+def prefix_ranges(prefixes):
+    """
+    Turn geohash prefixes into half-open [start, end) string ranges, merging
+    prefixes that are adjacent in sort order. Range comparisons can use a
+    plain B-tree index on every backend, unlike LIKE 'prefix%'. `end` is
+    None for a range that runs to the end of the geohash space.
+    """
+    ranges = []
+    for prefix in sorted(prefixes):
+        end = next_prefix(prefix)
+        if ranges and ranges[-1][1] == prefix:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((prefix, end))
+    return ranges
+
+
+def next_prefix(prefix):
+    """
+    Return the smallest geohash prefix sorting after every extension of
+    `prefix`, or None if there is none (the prefix is all 'z'). A sentinel
+    string would depend on the database collation sorting it after 'z'.
+    """
+    while prefix and prefix[-1] == BASE32[-1]:
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + BASE32[BASE32.index(prefix[-1]) + 1]
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return (min_lat, min_lng, max_lat, max_lng) enclosing a circle."""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    lng_delta = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def precision_for_zoom(zoom):
+    for max_zoom, precision in ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return 7
@@ -0,0 +1,58 @@
+"""
+Responsive variants of listing photos and the listing's cover image.
+
+Variants are Cloudinary transformation URLs derived from the stored
+original, so producing them costs no network call; Cloudinary renders each
+one on first request and caches it. Images hosted elsewhere use the
+original URL for every variant.
+"""
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import invalidate_properties_on_write
+
+CLOUDINARY_UPLOAD_PATH = '/image/upload/'
+
+# Variant -> Cloudinary transformation. q_auto/f_auto pick the quality and
+# format (WebP, AVIF) per browser.
+VARIANTS = {
+    'thumbnail': 'c_fill,w_400,h_300,q_auto,f_auto',
+    'medium': 'c_limit,w_960,q_auto,f_auto',
+    'large': 'c_limit,w_1920,q_auto,f_auto',
+}
+
+
+def variant_url(url, variant):
+    if 'res.cloudinary.com/' not in url or CLOUDINARY_UPLOAD_PATH not in url:
+        return url
+    return url.replace(CLOUDINARY_UPLOAD_PATH, f'{CLOUDINARY_UPLOAD_PATH}{VARIANTS[variant]}/', 1)
+
+
+def variant_urls(url):
+    """The `<variant>_url` field values of an image stored at `url`."""
+    return {f'{variant}_url': variant_url(url, variant) if url else '' for variant in VARIANTS}
+
+
+def cover_image_subquery(outer_ref='pk'):
+    from .models import PropertyImage
+
+    return Subquery(
+        PropertyImage.objects.filter(property=OuterRef(outer_ref), status=PropertyImage.READY)
+        .order_by('position', 'id').values('thumbnail_url')[:1]
+    )
+
+
+def images_changed(*property_ids):
+    """
+    Record that the images of these listings changed: recompute their
+    cover image and bump `updated_at` (which drives ETags and incremental
+    exports) in one UPDATE, then invalidate their cached responses.
+    """
+    from .models import Property
+
+    Property.objects.filter(pk__in=property_ids).update(
+        cover_image=Coalesce(cover_image_subquery(), Value('')),
+        updated_at=timezone.now(),
+    )
+    invalidate_properties_on_write(*property_ids)
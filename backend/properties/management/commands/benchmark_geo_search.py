@@ -0,0 +1,83 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.db.models.functions import Substr
+
+from accounts.models import CustomUser
+from properties import geo
+from properties.filters import distance_km, filter_within_box
+from properties.models import Property
+
+# Synthetic listings are scattered around Dhaka.
+CENTER = (23.78, 90.40)
+SPREAD = 0.6
+
+
+class Command(BaseCommand):
+    help = 'Time bounding-box, radius and cluster queries over a synthetic dataset (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with transaction.atomic():
+            self.populate(options['rows'])
+            self.run(options['repeat'])
+            transaction.set_rollback(True)
+
+    def populate(self, rows):
+        owner = CustomUser.objects.create_user('geo-benchmark@example.com', None, role='seller')
+        started = time.perf_counter()
+        batch = []
+        for index in range(rows):
+            latitude = round(CENTER[0] + random.uniform(-SPREAD, SPREAD), 6)
+            longitude = round(CENTER[1] + random.uniform(-SPREAD, SPREAD), 6)
+            batch.append(Property(
+                owner=owner, title=f'Geo benchmark {index}', description='', price=100000,
+                location='Dhaka', bedrooms=3, bathrooms=2, space=1200,
+                latitude=latitude, longitude=longitude, geohash=geo.encode(latitude, longitude),
+            ))
+            if len(batch) == 5000:
+                Property.objects.bulk_create(batch)
+                batch = []
+        Property.objects.bulk_create(batch)
+        self.stdout.write(f'Inserted {rows} listings in {time.perf_counter() - started:.1f}s')
+
+    def run(self, repeat):
+        latitude, longitude = CENTER
+        box = geo.bounding_box(latitude, longitude, 2)
+        min_lat, min_lng, max_lat, max_lng = box
+        viewport = geo.bounding_box(latitude, longitude, 10)
+        queries = {
+            'bbox, coordinates only': lambda: Property.objects.filter(
+                latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng),
+            ).values_list('pk'),
+            'bbox, geohash cells': lambda: filter_within_box(Property.objects.all(), *box).values_list('pk'),
+            'radius 2km': lambda: filter_within_box(Property.objects.all(), *box)
+            .annotate(distance_km=distance_km(latitude, longitude))
+            .filter(distance_km__lte=2).values_list('pk'),
+            'clusters, 10km viewport': lambda: clusters(filter_within_box(Property.objects.all(), *viewport), 13),
+            'clusters, whole dataset': lambda: clusters(Property.objects.all(), 11),
+        }
+        for name, build in queries.items():
+            rows = len(build())
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(build())
+            elapsed = (time.perf_counter() - started) / repeat * 1000
+            self.stdout.write(f'{name:<24} {rows:>7} rows  {elapsed:8.2f} ms/query')
+
+
+def clusters(queryset, zoom):
+    precision = geo.precision_for_zoom(zoom)
+    return (
+        queryset.annotate(cell=Substr('geohash', 1, precision))
+        .values('cell')
+        .annotate(count=Count('id'), latitude=Avg('latitude'), longitude=Avg('longitude'))
+    )
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import CustomUser
+from properties.fast_serializers import property_values, serialize_properties
+from properties.models import Property, PropertyImage
+from properties.renderers import ORJSONRenderer
+from properties.serializers import PropertySerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare PropertySerializer + JSONRenderer with the fast read path (rolled back afterwards).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--images', type=int, default=3, help='Images per listing.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.populate(max(options['rows']), options['images'])
+            for rows in options['rows']:
+                self.compare(rows, options['repeat'])
+            transaction.set_rollback(True)
+
+    def populate(self, rows, images):
+        owner = CustomUser.objects.create_user('serializer-benchmark@example.com', None, role='seller')
+        properties = Property.objects.bulk_create([
+            Property(
+                owner=owner, title=f'Serializer benchmark {index}', description='Bright flat ' * 40,
+                price=125000, location='Dhaka', bedrooms=3, bathrooms=2, space=1200,
+            )
+            for index in range(rows)
+        ], batch_size=2000)
+        PropertyImage.objects.bulk_create([
+            PropertyImage(property=prop, image=f'https://img.example.com/{prop.pk}/{n}.jpg')
+            for prop in properties
+            for n in range(images)
+        ], batch_size=5000)
+
+    def compare(self, rows, repeat):
+        ids = list(Property.objects.order_by('id').values_list('id', flat=True)[:rows])
+        queryset = Property.objects.filter(id__in=ids)
+
+        def drf():
+            data = PropertySerializer(queryset.select_related('owner').prefetch_related('images'), many=True).data
+            return JSONRenderer().render(data)
+
+        def fast():
+            return ORJSONRenderer().render(serialize_properties(list(property_values(queryset))))
+
+        results = {name: self.time(run, repeat) for name, run in (('PropertySerializer', drf), ('fast path', fast))}
+        baseline = results['PropertySerializer']
+        for name, elapsed in results.items():
+            self.stdout.write(
+                f'{rows:>6} rows  {name:<18} {elapsed * 1000:9.1f} ms  '
+                f'{rows / elapsed:10.0f} rows/s  x{baseline / elapsed:.1f}'
+            )
+
+    def time(self, run, repeat):
+        run()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        return (time.perf_counter() - started) / repeat
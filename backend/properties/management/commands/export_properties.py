@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.export import FORMATS, export_stream, parse_updated_since
+from properties.filters import PropertyFilter
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = 'Stream listings with images and owner as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=list(FORMATS), default='ndjson')
+        parser.add_argument('--file', help='Write to this path instead of stdout.')
+        parser.add_argument('--updated-since', help='Only listings updated at or after this ISO 8601 datetime.')
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='NAME=VALUE',
+            help='A PropertyView filter, e.g. --filter purpose="For Rent" --filter min_price=50000.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        data = {}
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Invalid --filter {item!r}, expected NAME=VALUE.')
+            data[name] = value
+
+        filterset = PropertyFilter(data=data, queryset=Property.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(f'Invalid filters: {dict(filterset.errors)}')
+        queryset = filterset.qs
+
+        if options['updated_since']:
+            since = parse_updated_since(options['updated_since'])
+            if since is None:
+                raise CommandError('--updated-since must be an ISO 8601 datetime.')
+            queryset = queryset.filter(updated_at__gte=since)
+
+        stream = open(options['file'], 'wb') if options['file'] else sys.stdout.buffer
+        try:
+            for chunk in export_stream(queryset, options['output'], options['chunk_size']):
+                stream.write(chunk)
+        finally:
+            if options['file']:
+                stream.close()
+            else:
+                stream.flush()
@@ -0,0 +1,209 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from accounts.models import CustomUser
+from properties.cache import LIST_TAG, invalidate_tags
+from properties.export import CSV_IMAGE_SEPARATOR
+from properties.images import variant_url
+from properties.models import Property, PropertyImage
+
+FIELDS = [
+    'title', 'description', 'price', 'location', 'bedrooms', 'bathrooms', 'space',
+    'property_type', 'purpose', 'latitude', 'longitude',
+]
+NULLABLE = {'latitude', 'longitude'}
+# Read before the model validates the row, so their types are checked up front.
+TEXT_KEYS = ['owner_email', 'owner', 'title']
+
+validate_url = URLValidator()
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import listings from CSV or JSONL. Each row needs an owner email '
+        '(`owner_email` or `owner`) and may list image URLs in `images`. '
+        'The output of export_properties can be imported as is.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, insert nothing.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+        file_format = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'jsonl')
+
+        self.owners = {}
+        self.seen_titles = set()
+        self.created = 0
+        self.failed = 0
+        started = time.perf_counter()
+
+        with path.open(newline='', encoding='utf-8') as handle:
+            rows = read_csv(handle) if file_format == 'csv' else read_jsonl(handle)
+            while True:
+                chunk = list(islice(rows, options['chunk_size']))
+                if not chunk:
+                    break
+                self.import_chunk(chunk, options['dry_run'])
+
+        if self.created:
+            invalidate_tags(LIST_TAG)
+
+        elapsed = time.perf_counter() - started
+        total = self.created + self.failed
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {self.created} listings, {self.failed} rejected, '
+            f'in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s).'
+        ))
+
+    def import_chunk(self, chunk, dry_run):
+        checked = []
+        for line, row in chunk:
+            try:
+                check_row(row)
+                checked.append((line, row, None))
+            except ValidationError as exc:
+                checked.append((line, row, exc))
+
+        rows = [row for _, row, error in checked if error is None]
+        self.resolve_owners({owner_email(row) for row in rows})
+        titles = [row['title'] for row in rows if row.get('title')]
+        taken = set(Property.objects.filter(title__in=titles).values_list('title', flat=True))
+
+        valid = []
+        for line, row, error in checked:
+            try:
+                if error is not None:
+                    raise error
+                valid.append((line, *self.build(row, taken)))
+            except ValidationError as exc:
+                self.reject(line, '; '.join(exc.messages))
+
+        if dry_run or not valid:
+            self.created += len(valid)
+            return
+
+        try:
+            with transaction.atomic():
+                properties = Property.objects.bulk_create([prop for _, prop, _ in valid])
+                images = [
+                    PropertyImage(property=prop, image=url, position=position)
+                    for prop, (_, _, urls) in zip(properties, valid)
+                    for position, url in enumerate(urls)
+                ]
+                for image in images:
+                    image.set_variants()
+                PropertyImage.objects.bulk_create(images)
+        except DatabaseError as exc:
+            for line, _, _ in valid:
+                self.reject(line, f'chunk rolled back: {exc}')
+            return
+        self.created += len(valid)
+
+    def resolve_owners(self, emails):
+        missing = {email for email in emails if email and email not in self.owners}
+        if missing:
+            self.owners.update(CustomUser.objects.filter(email__in=missing).values_list('email', 'id'))
+
+    def build(self, row, taken):
+        owner_id = self.owners.get(owner_email(row))
+        if owner_id is None:
+            raise ValidationError(f'Unknown owner {owner_email(row)!r}.')
+
+        title = row.get('title')
+        if title in taken or title in self.seen_titles:
+            raise ValidationError(f'A listing titled {title!r} already exists.')
+
+        values = {}
+        for field in FIELDS:
+            value = row.get(field)
+            if value in ('', None) and field in NULLABLE:
+                value = None
+            elif isinstance(value, float):
+                # DecimalField would round a float to max_digits significant
+                # digits, giving coordinates too many decimal places.
+                value = str(value)
+            if value is not None:
+                values[field] = value
+        prop = Property(owner_id=owner_id, **values)
+        prop.full_clean(exclude=['owner'], validate_unique=False, validate_constraints=False)
+        prop.geohash = prop.compute_geohash()
+
+        images = image_urls(row.get('images'))
+        for url in images:
+            validate_url(url)
+        prop.cover_image = variant_url(images[0], 'thumbnail') if images else ''
+
+        self.seen_titles.add(title)
+        return prop, images
+
+    def reject(self, line, message):
+        self.failed += 1
+        self.stderr.write(f'line {line}: {message}')
+
+
+def check_row(row):
+    """Reject rows of the wrong shape before the chunk-wide owner and title lookups."""
+    if isinstance(row, str):
+        raise ValidationError(row)
+    if not isinstance(row, dict):
+        raise ValidationError('Expected an object.')
+    for key in TEXT_KEYS:
+        if not isinstance(row.get(key), (str, type(None))):
+            raise ValidationError(f'{key} must be a string.')
+    images = row.get('images')
+    if images and not (
+        isinstance(images, str)
+        or isinstance(images, list) and all(isinstance(image, (str, dict)) for image in images)
+    ):
+        raise ValidationError('images must be a list of URLs or a separated string.')
+
+
+def owner_email(row):
+    return (row.get('owner_email') or row.get('owner') or '').strip()
+
+
+def image_urls(images):
+    """
+    Accept a list of URLs, a list of {"image": url} dicts (images that are not
+    uploaded yet are skipped), or a separated string.
+    """
+    if not images:
+        return []
+    if isinstance(images, str):
+        return [url for url in images.split(CSV_IMAGE_SEPARATOR) if url]
+    return [image['image'] if isinstance(image, dict) else image for image in images if image_ready(image)]
+
+
+def image_ready(image):
+    return not isinstance(image, dict) or (image.get('image') and image.get('status', 'ready') == 'ready')
+
+
+def read_csv(handle):
+    # Line numbers count the header as line 1.
+    for line, row in enumerate(csv.DictReader(handle), start=2):
+        yield line, row
+
+
+def read_jsonl(handle):
+    for line, text in enumerate(handle, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError as exc:
+            yield line, f'Invalid JSON: {exc}'
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from properties.uploads import drain, retry_failed
+
+
+class Command(BaseCommand):
+    help = 'Upload queued listing images to the image host, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Uploads running at the same time.')
+        parser.add_argument('--batch-size', type=int, default=20, help='Jobs claimed per round.')
+        parser.add_argument('--once', action='store_true', help='Exit when no job is due instead of polling.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds between polls when idle.')
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Requeue images whose upload failed every attempt before starting.',
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            self.stdout.write(f'{retry_failed()} failed images requeued.')
+        while True:
+            uploaded, failed = drain(options['workers'], options['batch_size'])
+            if uploaded or failed:
+                self.stdout.write(f'{uploaded} images ready, {failed} failed attempts.')
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
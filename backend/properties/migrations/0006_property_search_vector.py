@@ -0,0 +1,57 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}location, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}description, '')), 'C')
+"""
+
+FORWARD_SQL = [
+    """
+    CREATE FUNCTION properties_property_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {vector};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """.format(vector=SEARCH_VECTOR_SQL.format(row='NEW.')),
+    """
+    CREATE TRIGGER properties_property_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, location, description ON properties_property
+    FOR EACH ROW EXECUTE FUNCTION properties_property_search_vector_update();
+    """,
+    "UPDATE properties_property SET search_vector = {vector};".format(vector=SEARCH_VECTOR_SQL.format(row='')),
+    "CREATE INDEX properties_property_search_vector_gin ON properties_property USING gin (search_vector);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS properties_property_search_vector_gin;",
+    "DROP TRIGGER IF EXISTS properties_property_search_vector_trigger ON properties_property;",
+    "DROP FUNCTION IF EXISTS properties_property_search_vector_update();",
+]
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_property_status_alter_property_is_published'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(run_on_postgresql(FORWARD_SQL), run_on_postgresql(REVERSE_SQL)),
+    ]
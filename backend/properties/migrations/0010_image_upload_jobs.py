@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_property_moderation_claims'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=models.URLField(blank=True),
+        ),
+        migrations.CreateModel(
+            name='ImageUploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='image-uploads/')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('image', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='upload_job', to='properties.propertyimage')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run_after', 'id'], name='image_upload_job_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:19
+
+from django.db import migrations, models
+from django.db.models import Case, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Replace
+
+from properties.images import CLOUDINARY_UPLOAD_PATH, VARIANTS
+
+
+def backfill(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    PropertyImage = apps.get_model('properties', 'PropertyImage')
+
+    # Existing images keep position 0 and so their upload (id) order.
+    cloudinary = Q(image__contains='res.cloudinary.com/') & Q(image__contains=CLOUDINARY_UPLOAD_PATH)
+    PropertyImage.objects.update(**{
+        f'{variant}_url': Case(
+            When(cloudinary, then=Replace(
+                'image', Value(CLOUDINARY_UPLOAD_PATH), Value(f'{CLOUDINARY_UPLOAD_PATH}{transformation}/'),
+            )),
+            default='image',
+        )
+        for variant, transformation in VARIANTS.items()
+    })
+
+    cover = Subquery(
+        PropertyImage.objects.filter(property=OuterRef('pk'), status='ready')
+        .order_by('position', 'id').values('thumbnail_url')[:1]
+    )
+    Property.objects.update(cover_image=Coalesce(cover, Value('')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_property_image_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='propertyimage',
+            options={'ordering': ['position', 'id']},
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='cover_image',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='large_url',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='medium_url',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='thumbnail_url',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=models.Index(fields=['property', 'position', 'id'], name='property_image_order_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
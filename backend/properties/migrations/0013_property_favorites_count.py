@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_image_variants_and_cover'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['-favorites_count', '-id'], name='property_popular_idx'),
+        ),
+    ]
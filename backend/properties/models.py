@@ -1,5 +1,11 @@
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
+
+from . import geo
+from .images import variant_urls
 
 class Property(models.Model):
     SALE = 'For Sale'
@@ -34,15 +40,141 @@ class Property(models.Model):
     purpose = models.CharField(max_length=10, choices=PURPOSE_CHOICES, default=SALE)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
     is_published = models.BooleanField(default=False)  
+    latitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.DecimalField(
+        max_digits=9, decimal_places=6, null=True, blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # Derived from latitude/longitude on save; indexed for viewport queries.
+    geohash = models.CharField(max_length=geo.MAX_PRECISION, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger on PostgreSQL (see migration 0006),
+    # weighted title > location > description. Unused on other backends.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Thumbnail of the first ready image, kept up to date by images_changed(),
+    # so listing cards need no join on PropertyImage.
+    cover_image = models.URLField(max_length=500, blank=True, editable=False)
+    # Number of users who saved the listing. Kept with F() updates by the
+    # favorites app and repaired by `manage.py reconcile_favorite_counts`.
+    # Changes leave updated_at alone; they invalidate the listing's cached
+    # responses and the popularity rankings, and ETags include the count.
+    favorites_count = models.PositiveIntegerField(default=0, editable=False)
+    # Moderation queue lease: the moderator reviewing a pending listing, and
+    # when the claim lapses so another moderator can pick it up.
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='moderation_claims', editable=False,
+    )
+    claim_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Listings are read newest first, so each common filter gets an index
+        # ending in (created_at, id) that serves both the WHERE and the ORDER BY.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='property_recent_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='property_status_recent_idx'),
+            models.Index(fields=['is_published', '-created_at', '-id'], name='property_published_recent_idx'),
+            models.Index(fields=['purpose', '-created_at', '-id'], name='property_purpose_recent_idx'),
+            models.Index(fields=['property_type', '-created_at', '-id'], name='property_type_recent_idx'),
+            models.Index(fields=['location', '-created_at', '-id'], name='property_location_recent_idx'),
+            models.Index(fields=['purpose', 'price'], name='property_purpose_price_idx'),
+            models.Index(fields=['bedrooms', 'price'], name='property_bedrooms_price_idx'),
+            models.Index(fields=['space'], name='property_space_idx'),
+            models.Index(fields=['geohash'], name='property_geohash_idx'),
+            models.Index(fields=['-favorites_count', '-id'], name='property_popular_idx'),
+            # Only pending listings are queued; the index stays the size of
+            # the backlog however many reviewed listings accumulate.
+            models.Index(
+                fields=['created_at', 'id'], name='property_pending_queue_idx',
+                condition=models.Q(status='Pending'),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.geohash = self.compute_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            return ''
+        return geo.encode(self.latitude, self.longitude)
+
 class PropertyImage(models.Model):
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
     property = models.ForeignKey(Property, related_name='images', on_delete=models.CASCADE)
-    image = models.URLField()  
+    # Empty until the upload job of a pending image has stored the file.
+    image = models.URLField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=READY)
+    # Gallery order; the first ready image is the listing's cover.
+    position = models.PositiveIntegerField(default=0)
+    # Resized versions of `image`, derived from it on save.
+    thumbnail_url = models.URLField(max_length=500, blank=True, editable=False)
+    medium_url = models.URLField(max_length=500, blank=True, editable=False)
+    large_url = models.URLField(max_length=500, blank=True, editable=False)
+    # SHA-256 of the file and its size in bytes, for images uploaded through
+    # the API; identical files reuse the URL of an earlier upload.
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    size = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['position', 'id']
+        indexes = [
+            models.Index(fields=['content_hash'], name='property_image_hash_idx'),
+            models.Index(fields=['property', 'position', 'id'], name='property_image_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"Image for {self.property.title}"
+
+    def save(self, *args, **kwargs):
+        self.set_variants()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'image' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(variant_urls(''))
+        super().save(*args, **kwargs)
+
+    def set_variants(self):
+        """Derive the variant URLs from `image`; bulk_create callers call this themselves."""
+        for field, url in variant_urls(self.image).items():
+            setattr(self, field, url)
+
+
+class ImageUploadJob(models.Model):
+    """
+    A queued upload of one PropertyImage, drained by `process_image_uploads`.
+    The job is deleted, with its file, once the upload succeeds.
+    """
+    image = models.OneToOneField(PropertyImage, related_name='upload_job', on_delete=models.CASCADE)
+    file = models.FileField(upload_to='image-uploads/')
+    attempts = models.PositiveIntegerField(default=0)
+    # Not picked up before this time: set for backoff after a failure, and
+    # as a lease while a worker holds the job.
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['run_after', 'id'], name='image_upload_job_due_idx'),
+        ]
 
     def __str__(self):
-        return f"Image for {self.property.title}"
\ No newline at end of file
+        return f"Upload of {self.file.name}"
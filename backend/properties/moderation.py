@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from notifications.outbox import record_moderation
+
+from .cache import invalidate_properties_on_write
+from .models import Property
+
+# Moderation action -> (status, is_published) it leaves the listing in.
+ACTIONS = {
+    'approve': (Property.APPROVED, True),
+    'reject': (Property.REJECTED, False),
+}
+# Listing status -> the moderation action that sets it.
+STATUS_ACTIONS = {status: action for action, (status, _) in ACTIONS.items()}
+
+NOT_FOUND = 'not_found'
+UNCHANGED = 'unchanged'
+UPDATED = 'updated'
+
+
+def bulk_moderate(property_ids, action):
+    """
+    Apply a moderation action to many listings with a single UPDATE.
+
+    Returns `{id: outcome}` in the order the ids were given: `not_found`,
+    `unchanged` when the listing was already in the target state, or
+    `updated`. The affected rows are locked while their current state is
+    read, so two moderators acting on the same ids report each change once.
+    """
+    target = ACTIONS[action]
+    property_ids = list(dict.fromkeys(property_ids))
+
+    with transaction.atomic():
+        current = {
+            prop.pk: prop
+            for prop in Property.objects.select_for_update()
+            .filter(pk__in=property_ids)
+            .only('id', 'status', 'is_published', 'owner_id', 'title')
+        }
+        changed = [prop for prop in current.values() if (prop.status, prop.is_published) != target]
+        if changed:
+            status, is_published = target
+            changed_ids = [prop.pk for prop in changed]
+            # update() skips auto_now, but updated_at drives ETags and exports.
+            Property.objects.filter(pk__in=changed_ids).update(
+                status=status, is_published=is_published, updated_at=timezone.now(),
+                claimed_by=None, claim_expires_at=None,
+            )
+            record_moderation(changed, approved=is_published)
+            invalidate_properties_on_write(*changed_ids)
+
+    changed = {prop.pk for prop in changed}
+    return {
+        pk: UPDATED if pk in changed else UNCHANGED if pk in current else NOT_FOUND
+        for pk in property_ids
+    }
+
+
+def claim_pending(user, limit):
+    """
+    Lease the next `limit` pending listings, oldest first, to `user`.
+
+    Listings under another moderator's unexpired claim are skipped, as are
+    rows another transaction is claiming right now (SKIP LOCKED), so
+    concurrent moderators never receive the same listing and never wait on
+    each other. The user's own live claims are handed back and renewed.
+    Returns the claimed ids and the lease expiry.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.PROPERTY_MODERATION_LEASE_SECONDS)
+    with transaction.atomic():
+        property_ids = list(
+            Property.objects.select_for_update(skip_locked=True)
+            .filter(status=Property.PENDING)
+            .filter(Q(claim_expires_at__isnull=True) | Q(claim_expires_at__lte=now) | Q(claimed_by=user))
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if property_ids:
+            Property.objects.filter(pk__in=property_ids).update(claimed_by=user, claim_expires_at=expires_at)
+    return property_ids, expires_at
+
+
+def release_claims(user, property_ids=None):
+    """Give back the user's claims (all of them unless `property_ids` is given)."""
+    claims = Property.objects.filter(claimed_by=user)
+    if property_ids is not None:
+        claims = claims.filter(pk__in=property_ids)
+    return claims.update(claimed_by=None, claim_expires_at=None)
@@ -0,0 +1,140 @@
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import exceptions
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on every field of `ordering`.
+
+    DRF's CursorPagination only filters on the first ordering field and falls
+    back to an OFFSET for ties. Here the cursor stores the full position of the
+    boundary row, so a page is always a `WHERE (a, b) < (x, y) LIMIT n` seek and
+    deep pages cost the same as the first one. The last ordering field must be
+    unique (normally the primary key) for the cursors to be stable.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor.reverse)
+        current_position = self.cursor.position if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # Fetch one extra row to find out whether another page follows this one.
+        # A forged cursor can hold values the fields cannot parse.
+        try:
+            if current_position is not None:
+                queryset = queryset.filter(self._seek_filter(current_position, reverse))
+            results = list(queryset[:self.page_size + 1])
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = current_position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor(Cursor(offset=0, reverse=False, position=None))
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            field_name = field.lstrip('-')
+            if isinstance(instance, dict):
+                value = instance[field_name]
+            else:
+                value = getattr(instance, field_name)
+            values.append(str(value))
+        return json.dumps(values)
+
+    def _seek_filter(self, position, reverse):
+        """
+        Build the row-value comparison `ordering > position` as an OR of
+        prefix-equal clauses, honouring the direction of each field.
+        """
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            field_name = field.lstrip('-')
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = [Q(**{self.ordering[i].lstrip('-'): position[i]}) for i in range(index)]
+            clauses.append(reduce(and_, equal + [Q(**{f'{field_name}__{lookup}': position[index]})]))
+        return reduce(or_, clauses)
+
+
+class PropertyCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at', '-id')
+    # `?ordering=` values; each is served by an index on Property.
+    orderings = {
+        'newest': ('-created_at', '-id'),
+        'popular': ('-favorites_count', '-id'),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        name = request.query_params.get('ordering')
+        if name is not None and name not in self.orderings:
+            raise exceptions.ValidationError({'ordering': f'Must be one of: {", ".join(self.orderings)}'})
+        ordering = self.orderings.get(name, self.ordering)
+        # Search results carry a relevance `rank`; best matches come first.
+        if 'rank' in queryset.query.annotations:
+            return ('-rank',) + ordering
+        return ordering
+
+
+def _reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
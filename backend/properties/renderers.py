@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (Decimal, Promise)):
+        return str(value)
+    raise TypeError
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson. Falls back to DRF's renderer when orjson
+    is not installed or when indented output is requested.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_default)
@@ -0,0 +1,64 @@
+import re
+from functools import reduce
+from operator import add
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from rest_framework.filters import SearchFilter
+
+# ts_rank weights for the D, C, B and A labels set by the search_vector
+# trigger: description is C, location is B and title is A.
+RANK_WEIGHTS = [0.1, 0.2, 0.4, 1.0]
+SEARCH_CONFIG = 'english'
+
+
+def prefix_tsquery(terms):
+    """
+    A to_tsquery() string matching every term, the last one as a prefix, so
+    a search box typed into matches as you go ('gul' finds "Gulshan").
+    Terms are reduced to word characters, leaving no tsquery operators.
+    Returns '' when nothing searchable is left.
+    """
+    words = [word for term in terms for word in re.findall(r'\w+', term)]
+    if not words:
+        return ''
+    return ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+
+
+class PropertySearchFilter(SearchFilter):
+    """
+    Full-text search over title, location and description.
+
+    On PostgreSQL this matches against the GIN-indexed `search_vector` column,
+    the last term as a prefix, and annotates a `rank` from ts_rank. Other backends (the SQLite test
+    database) fall back to DRF's icontains search with a `rank` built from the
+    same title > location > description weights, so ordering and pagination
+    behave the same everywhere.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        if connections[queryset.db].vendor == 'postgresql':
+            tsquery = prefix_tsquery(terms)
+            if not tsquery:
+                return queryset.none()
+            query = SearchQuery(tsquery, config=SEARCH_CONFIG, search_type='raw')
+            rank = SearchRank(F('search_vector'), query, weights=RANK_WEIGHTS)
+            # ts_rank returns a real; compare as double so cursor positions round-trip exactly.
+            return queryset.filter(search_vector=query).annotate(rank=Cast(rank, FloatField()))
+
+        queryset = super().filter_queryset(request, queryset, view)
+        return queryset.annotate(rank=reduce(add, [self._fallback_rank(term) for term in terms]))
+
+    def _fallback_rank(self, term):
+        d, c, b, a = RANK_WEIGHTS
+        return (
+            Case(When(title__icontains=term, then=Value(a)), default=Value(0.0), output_field=FloatField())
+            + Case(When(location__icontains=term, then=Value(b)), default=Value(0.0), output_field=FloatField())
+            + Case(When(description__icontains=term, then=Value(c)), default=Value(0.0), output_field=FloatField())
+        )
@@ -4,7 +4,9 @@ from .models import Property, PropertyImage
 class PropertyImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = PropertyImage
-        fields = ['id', 'image']  # image will store the Cloudinary URL
+        # image will store the Cloudinary URL once status is ready
+        fields = ['id', 'image', 'status', 'position', 'thumbnail_url', 'medium_url', 'large_url']
+        read_only_fields = ['thumbnail_url', 'medium_url', 'large_url']
 
 class PropertySerializer(serializers.ModelSerializer):
     images = PropertyImageSerializer(many=True, read_only=True)
@@ -15,5 +17,31 @@ class PropertySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'owner', 'title', 'description', 'price', 'location',
             'bedrooms', 'bathrooms', 'space', 'property_type', 'purpose', 'is_published',
+            'latitude', 'longitude', 'cover_image', 'favorites_count',
             'created_at', 'updated_at', 'images'
         ]
+
+
+class BulkModerationSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
+
+
+class ModerationClaimSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class ModerationReleaseSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=1000)
+
+
+class DirectUploadSerializer(serializers.Serializer):
+    """The fields of Cloudinary's upload response needed to confirm it."""
+    public_id = serializers.CharField(max_length=255)
+    version = serializers.IntegerField(min_value=1)
+    signature = serializers.CharField(max_length=128)
+    format = serializers.ChoiceField(choices=['jpg', 'jpeg', 'png', 'webp'])
+
+
+class DirectUploadConfirmSerializer(serializers.Serializer):
+    images = DirectUploadSerializer(many=True, allow_empty=False, max_length=50)
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_properties_on_write
+from .images import images_changed
+from .models import ImageUploadJob, Property, PropertyImage
+
+
+@receiver([post_save, post_delete], sender=Property)
+def invalidate_property(sender, instance, **kwargs):
+    invalidate_properties_on_write(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=PropertyImage)
+def invalidate_property_image(sender, instance, **kwargs):
+    # Images are part of the listing: they bump its Last-Modified/ETag and
+    # may change its cover image.
+    images_changed(instance.property_id)
+
+
+@receiver(post_delete, sender=ImageUploadJob)
+def delete_upload_file(sender, instance, **kwargs):
+    # Covers jobs dropped with their image or listing before a worker got
+    # to them, as well as finished ones. Waits for the commit so a rolled
+    # back delete keeps its file.
+    if instance.file:
+        transaction.on_commit(lambda: instance.file.delete(save=False))
@@ -0,0 +1,251 @@
+"""
+Image uploads queued in the database and drained by `process_image_uploads`.
+
+Creating a listing stores each photo locally with an ImageUploadJob and a
+`pending` PropertyImage, so the request returns without waiting on the CDN.
+The worker claims due jobs, uploads their files through a bounded thread
+pool, and marks each image `ready` (or retries it with exponential backoff,
+and finally marks it `failed`, until `retry_failed` requeues it). Only the
+uploads run in threads; every database write happens on the worker's main
+thread. Deleting a job, for whatever reason, deletes its file.
+
+Files are identified by a SHA-256 of their content. A file that was already
+uploaded, for any listing, reuses the stored URL instead of being uploaded
+again.
+"""
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from cloudinary.uploader import upload as cloudinary_upload
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .images import images_changed
+from .models import ImageUploadJob, PropertyImage
+
+
+def cloudinary_uploader(file):
+    """Upload a file to Cloudinary and return its URL."""
+    return cloudinary_upload(file)['secure_url']
+
+
+def get_uploader():
+    return import_string(settings.PROPERTY_IMAGE_UPLOADER)
+
+
+def content_hash(file):
+    """SHA-256 hex digest of an uploaded file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def uploaded_urls(hashes):
+    """Map each content hash that was uploaded before to its stored URL."""
+    hashes = [value for value in hashes if value]
+    if not hashes:
+        return {}
+    return dict(
+        PropertyImage.objects.filter(content_hash__in=hashes, status=PropertyImage.READY)
+        .values_list('content_hash', 'image')
+    )
+
+
+def enqueue_uploads(property_instance, files):
+    """
+    Add the uploaded files as images of a listing. Files uploaded before are
+    ready at once with the stored URL; the others become pending images with
+    an upload job. A file attached twice is only added once.
+    """
+    files_by_hash = {}
+    for file in files:
+        files_by_hash.setdefault(content_hash(file), file)
+    known = uploaded_urls(files_by_hash)
+
+    first_position = next_position(property_instance)
+    images = [
+        PropertyImage(
+            property=property_instance,
+            image=known.get(digest, ''),
+            status=PropertyImage.READY if digest in known else PropertyImage.PENDING,
+            position=first_position + index,
+            content_hash=digest,
+            size=file.size,
+        )
+        for index, (digest, file) in enumerate(files_by_hash.items())
+    ]
+    for image in images:
+        image.set_variants()
+    images = PropertyImage.objects.bulk_create(images)
+    ImageUploadJob.objects.bulk_create([
+        ImageUploadJob(image=image, file=files_by_hash[image.content_hash])
+        for image in images if image.status == PropertyImage.PENDING
+    ])
+    if any(image.status == PropertyImage.READY for image in images):
+        images_changed(property_instance.pk)
+    return images
+
+
+def next_position(property_instance):
+    """The gallery position after the listing's last image."""
+    last = property_instance.images.aggregate(last=Max('position'))['last']
+    return 0 if last is None else last + 1
+
+
+def claim_jobs(limit):
+    """
+    Lease up to `limit` due jobs to this worker by pushing their `run_after`
+    past the upload timeout, so other workers skip them meanwhile.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            ImageUploadJob.objects.select_for_update(skip_locked=True)
+            .select_related('image')
+            .filter(run_after__lte=now, image__status=PropertyImage.PENDING)
+            .order_by('run_after', 'id')[:limit]
+        )
+        if jobs:
+            lease = now + timedelta(seconds=settings.PROPERTY_IMAGE_UPLOAD_LEASE_SECONDS)
+            ImageUploadJob.objects.filter(pk__in=[job.pk for job in jobs]).update(run_after=lease)
+    return jobs
+
+
+def _upload(uploader, job):
+    with default_storage.open(job.file.name, 'rb') as file:
+        return uploader(file)
+
+
+def process_jobs(jobs, executor, uploader=None):
+    """
+    Upload the files of `jobs` concurrently on `executor` and record the
+    outcome of each. Jobs for a file that is already stored, or that another
+    job of the batch uploads, reuse that URL. Returns `(ready, failed)`
+    counts.
+    """
+    uploader = uploader or get_uploader()
+    known = uploaded_urls(job.image.content_hash for job in jobs)
+
+    # One upload per distinct file; jobs without a hash upload on their own.
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.image.content_hash or f'job:{job.pk}', []).append(job)
+    futures = [
+        (group, executor.submit(_upload, uploader, group[0]))
+        for digest, group in groups.items() if digest not in known
+    ]
+
+    ready = failed = 0
+    for digest, group in groups.items():
+        if digest in known:
+            ready += sum(record_success(job, known[digest]) for job in group)
+    for group, future in futures:
+        try:
+            url = future.result()
+        except Exception as exc:
+            failed += sum(record_failure(job, exc) for job in group)
+        else:
+            ready += sum(record_success(job, url) for job in group)
+    return ready, failed
+
+
+def record_success(job, url):
+    """
+    Mark the job's image ready and drop the job (its file goes with it, see
+    `signals.delete_upload_file`). Returns False if the image (or its
+    listing) was deleted while the job was pending.
+    """
+    with transaction.atomic():
+        updated = PropertyImage.objects.filter(pk=job.image_id).update(image=url, status=PropertyImage.READY)
+        ImageUploadJob.objects.filter(pk=job.pk).delete()
+    if updated:
+        images_changed(job.image.property_id)
+    return bool(updated)
+
+
+def record_failure(job, error):
+    """
+    Schedule a retry, or give up after the last attempt. Returns False,
+    after cleaning up the job, if its image was deleted meanwhile.
+    """
+    attempts = job.attempts + 1
+    changes = {'attempts': attempts, 'last_error': f'{type(error).__name__}: {error}'}
+    with transaction.atomic():
+        if attempts >= settings.PROPERTY_IMAGE_UPLOAD_MAX_ATTEMPTS:
+            # Keep the job and its file so the failure can be inspected and
+            # retried with `process_image_uploads --retry-failed`.
+            exists = PropertyImage.objects.filter(pk=job.image_id).update(status=PropertyImage.FAILED)
+        else:
+            delay = settings.PROPERTY_IMAGE_UPLOAD_BACKOFF_SECONDS * 2 ** (attempts - 1)
+            changes['run_after'] = timezone.now() + timedelta(seconds=delay)
+            exists = PropertyImage.objects.filter(pk=job.image_id).exists()
+        updated = exists and ImageUploadJob.objects.filter(pk=job.pk).update(**changes)
+    if not updated:
+        ImageUploadJob.objects.filter(pk=job.pk).delete()
+        return False
+    if attempts >= settings.PROPERTY_IMAGE_UPLOAD_MAX_ATTEMPTS:
+        images_changed(job.image.property_id)
+    return True
+
+
+def retry_failed():
+    """
+    Put every failed image back in the queue with a fresh set of attempts.
+    Returns the number of images requeued.
+    """
+    with transaction.atomic():
+        images = list(
+            PropertyImage.objects.select_for_update()
+            .filter(status=PropertyImage.FAILED, upload_job__isnull=False)
+            .values_list('pk', 'property_id')
+        )
+        if not images:
+            return 0
+        ImageUploadJob.objects.filter(image_id__in=[pk for pk, _ in images]).update(
+            attempts=0, run_after=timezone.now(), last_error='',
+        )
+        PropertyImage.objects.filter(pk__in=[pk for pk, _ in images]).update(status=PropertyImage.PENDING)
+    for property_id in {property_id for _, property_id in images}:
+        images_changed(property_id)
+    return len(images)
+
+
+def drain(workers=4, batch_size=20, uploader=None):
+    """
+    Process due jobs until none are left. Returns `(ready, failed)` counts;
+    jobs whose image was deleted meanwhile are dropped and count as neither.
+    """
+    ready = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            jobs = claim_jobs(batch_size)
+            if not jobs:
+                return ready, failed
+            batch_ready, batch_failed = process_jobs(jobs, executor, uploader)
+            ready += batch_ready
+            failed += batch_failed
+
+
+def dedup_stats():
+    """
+    Uploads and bytes saved by content-hash deduplication: every image
+    sharing the file of an earlier one is an upload that did not happen.
+    """
+    per_file = (
+        PropertyImage.objects.exclude(content_hash='')
+        .values('content_hash')
+        .annotate(copies=Count('id'), size=Max('size'))
+        .filter(copies__gt=1)
+    )
+    saved = {'uploads_saved': 0, 'bytes_saved': 0}
+    for row in per_file:
+        saved['uploads_saved'] += row['copies'] - 1
+        saved['bytes_saved'] += (row['copies'] - 1) * (row['size'] or 0)
+    return saved
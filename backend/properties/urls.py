@@ -1,10 +1,25 @@
 from django.urls import path
-from .views import PropertyView, MyPropertiesView, SellerPropertyApprove
+from .views import (
+    PropertyView, PropertyFacetView, PropertyMostSavedView, PropertyClusterView, PropertyExportView,
+    PropertyCacheStatsView, PropertyImageStatsView, MyPropertiesView, SellerPropertyApprove, PropertyBulkModerationView,
+    ModerationQueueView, ModerationReleaseView, PropertyUploadSignatureView, PropertyUploadConfirmView,
+)
 
 urlpatterns = [
     path('', PropertyView.as_view(), name='property-list-create'),  # GET all / POST new
     path('<int:id>/', PropertyView.as_view(), name='property-detail'),  # GET/PUT/DELETE by ID
+    path('<int:id>/uploads/sign/', PropertyUploadSignatureView.as_view(), name='property-upload-sign'),
+    path('<int:id>/uploads/confirm/', PropertyUploadConfirmView.as_view(), name='property-upload-confirm'),
+    path('facets/', PropertyFacetView.as_view(), name='property-facets'),
+    path('most-saved/', PropertyMostSavedView.as_view(), name='property-most-saved'),
+    path('clusters/', PropertyClusterView.as_view(), name='property-clusters'),
+    path('export/', PropertyExportView.as_view(), name='property-export'),
+    path('cache-stats/', PropertyCacheStatsView.as_view(), name='property-cache-stats'),
+    path('image-stats/', PropertyImageStatsView.as_view(), name='property-image-stats'),
     path('my-properties/', MyPropertiesView.as_view(), name='my-properties'), 
     path('properties-permission/<int:id>/', SellerPropertyApprove.as_view(), name= 'SellerPropertyApprove'),
+    path('properties-permission/bulk/', PropertyBulkModerationView.as_view(), name='property-bulk-moderation'),
+    path('properties-permission/queue/', ModerationQueueView.as_view(), name='moderation-queue'),
+    path('properties-permission/queue/release/', ModerationReleaseView.as_view(), name='moderation-queue-release'),
 
 ]
@@ -1,20 +1,46 @@
 from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.views import APIView
-from cloudinary.uploader import upload as cloudinary_upload
+from rest_framework.renderers import BrowsableAPIRenderer
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.db.models.functions import Substr
 import json
 
 from .models import Property, PropertyImage
-from .serializers import PropertySerializer
+from .serializers import (
+    BulkModerationSerializer, DirectUploadConfirmSerializer, ModerationClaimSerializer,
+    ModerationReleaseSerializer, PropertyImageSerializer, PropertySerializer,
+)
+from .pagination import PropertyCursorPagination
+from .search import PropertySearchFilter
+from .filters import PropertyFilter
+from .facets import compute_facets
+from . import geo
+from .cache import LIST_TAG, POPULARITY_TAG, cached, get_stats, normalize_query_params, property_tag
+from .fast_serializers import fields_from_request, property_values, serialize_properties
+from .renderers import ORJSONRenderer
+from .export import FORMATS, export_stream, parse_updated_since
+from .conditional import detail_validators, list_validators, not_modified, set_validators
+from .uploads import dedup_stats, enqueue_uploads, next_position
+from .images import images_changed
+from .direct_uploads import DirectUploadsUnavailable, confirmed_urls, signed_upload_params
+from .moderation import ACTIONS, NOT_FOUND, STATUS_ACTIONS, UPDATED, bulk_moderate, claim_pending, release_claims
+from accounts.permission import IsAdmin, IsSuperAdmin
 
 class PropertyView(generics.GenericAPIView):
-    queryset = Property.objects.all()
+    queryset = Property.objects.select_related('owner').prefetch_related('images')
     serializer_class = PropertySerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    filterset_fields = ['location', 'bedrooms', 'bathrooms', 'property_type', 'purpose']
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+    pagination_class = PropertyCursorPagination
+    filter_backends = [DjangoFilterBackend, PropertySearchFilter]
+    filterset_class = PropertyFilter
     search_fields = ['title', 'description', 'location']
     lookup_field = 'id'
 
@@ -24,14 +50,52 @@ class PropertyView(generics.GenericAPIView):
         return [AllowAny()]
 
     def get(self, request, id=None):
+        # Validators are cached under the same tags as the data, so a
+        # revalidation of an unchanged listing needs no query at all.
         if id:
-            property_instance = self.get_object()
-            serializer = self.get_serializer(property_instance)
-            return Response(serializer.data)
+            tags = [property_tag(id)]
+            params = [('id', id)] + normalize_query_params(request.query_params)
+            validators, _ = cached(
+                'properties:detail-validators', tags, params,
+                lambda: detail_validators(Property.objects.all(), id, params),
+            )
+            if validators is None:
+                raise Http404
         else:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
+            # Pagination links are absolute, so the host is part of the key.
+            tags = [LIST_TAG]
+            if request.query_params.get('ordering') == 'popular':
+                tags.append(POPULARITY_TAG)
+            params = normalize_query_params(request.query_params) + [('host', request.get_host())]
+            validators, _ = cached(
+                'properties:list-validators', tags, params,
+                lambda: list_validators(self.filter_queryset(Property.objects.all()), params),
+            )
+
+        not_modified_response = not_modified(request, *validators)
+        if not_modified_response is not None:
+            return not_modified_response
+
+        if id:
+            data, hit = cached('properties:detail', tags, params, lambda: self._detail_data(id))
+        else:
+            data, hit = cached('properties:list', tags, params, self._list_data)
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return set_validators(response, *validators)
+
+    def _list_data(self):
+        fields = fields_from_request(self.request.query_params)
+        queryset = property_values(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serialize_properties(page, fields=fields)).data
+
+    def _detail_data(self, id):
+        fields = fields_from_request(self.request.query_params)
+        rows = list(property_values(Property.objects.filter(pk=id), fields))
+        if not rows:
+            raise Http404
+        return serialize_properties(rows, fields=fields)[0]
 
     def post(self, request):
         property_data_json = request.POST.get('propertyData')
@@ -44,14 +108,11 @@ class PropertyView(generics.GenericAPIView):
 
         serializer = self.get_serializer(data=property_data)
         if serializer.is_valid():
-            property_instance = serializer.save(owner=request.user)
-
-            for img in images:
-                result = cloudinary_upload(img)
-                PropertyImage.objects.create(
-                    property=property_instance,
-                    image=result['secure_url']
-                )
+            # Photos are uploaded by the image worker; the listing and its
+            # pending images are created together or not at all.
+            with transaction.atomic():
+                property_instance = serializer.save(owner=request.user)
+                enqueue_uploads(property_instance, images)
 
             return Response(self.get_serializer(property_instance).data, status=status.HTTP_201_CREATED)
 
@@ -67,17 +128,34 @@ class PropertyView(generics.GenericAPIView):
         property_instance = self.get_object()
         serializer = self.get_serializer(property_instance, data=request.data, partial=True)
         if serializer.is_valid():
-            is_published = property_instance.is_published
-            if 'status' in serializer.validated_data:
-                if serializer.validated_data['status'] == 'Approved':
-                    is_published = True
-                elif serializer.validated_data['status'] == 'Rejected':
-                    is_published = False
-            
-            serializer.save(is_published=is_published)
+            action = self._moderation_action(request, property_instance)
+            with transaction.atomic():
+                serializer.save()
+                if action:
+                    bulk_moderate([property_instance.pk], action)
+            if action:
+                property_instance.refresh_from_db()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _moderation_action(self, request, property_instance):
+        """
+        The moderation action asked for by `status` ('Approved' or
+        'Rejected'), applied through bulk_moderate so the listing is
+        (un)published, its claim cleared and its owner notified. Only
+        moderators may change the status; others may send the current one,
+        as the edit form does.
+        """
+        new_status = request.data.get('status')
+        action = STATUS_ACTIONS.get(new_status)
+        if action is None:
+            return None
+        if not (IsAdmin().has_permission(request, self) or IsSuperAdmin().has_permission(request, self)):
+            if new_status != property_instance.status:
+                raise PermissionDenied('Only moderators can approve or reject listings.')
+            return None
+        return action
+
     def delete(self, request, id=None):
         property_instance = self.get_object()
         property_instance.delete()
@@ -87,29 +165,306 @@ class PropertyView(generics.GenericAPIView):
 
 
 
+class PropertyFacetView(generics.GenericAPIView):
+    """
+    GET: Facet counts for the search sidebar. Accepts the same filter and
+    search parameters as PropertyView and caches each filter set briefly.
+    """
+    queryset = Property.objects.all()
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend, PropertySearchFilter]
+    filterset_class = PropertyFilter
+    search_fields = ['title', 'description', 'location']
+
+    def get(self, request):
+        params = normalize_query_params(request.query_params, exclude=('cursor', 'page_size'))
+        facets, hit = cached(
+            'properties:facets', [LIST_TAG], params,
+            lambda: compute_facets(self.filter_queryset(self.get_queryset())),
+            timeout=settings.PROPERTY_FACETS_CACHE_TIMEOUT,
+        )
+        response = Response(facets)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class PropertyMostSavedView(generics.GenericAPIView):
+    """
+    GET: The most saved listings, most favorites first (`?limit=`, default
+    10, at most 50). Accepts PropertyView's filters and sparse fieldsets.
+    Read from the `-favorites_count` index and cached briefly.
+    """
+    queryset = Property.objects.filter(favorites_count__gt=0)
+    permission_classes = [AllowAny]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PropertyFilter
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self.max_limit)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        fields = fields_from_request(request.query_params)
+
+        def compute():
+            queryset = self.filter_queryset(self.get_queryset()).order_by('-favorites_count', '-id')
+            return serialize_properties(list(property_values(queryset, fields)[:max(limit, 0)]), fields=fields)
+
+        data, hit = cached(
+            'properties:most-saved', [LIST_TAG, POPULARITY_TAG], normalize_query_params(request.query_params), compute,
+            timeout=settings.PROPERTY_RANKING_CACHE_TIMEOUT,
+        )
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class PropertyClusterView(generics.GenericAPIView):
+    """
+    GET: Server-side map clusters. Groups the filtered listings (normally
+    restricted with `bbox`) by geohash prefix, with the prefix length chosen
+    from the map's `zoom` level.
+    """
+    queryset = Property.objects.exclude(geohash='')
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PropertyFilter
+
+    def get(self, request):
+        try:
+            zoom = int(request.query_params.get('zoom', 10))
+        except ValueError:
+            return Response({'error': 'zoom must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        precision = geo.precision_for_zoom(zoom)
+        clusters = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .annotate(cell=Substr('geohash', 1, precision))
+            .values('cell')
+            .annotate(count=Count('id'), latitude=Avg('latitude'), longitude=Avg('longitude'))
+            .order_by('cell')
+        )
+        return Response([
+            {
+                'geohash': cluster['cell'],
+                'count': cluster['count'],
+                'latitude': round(float(cluster['latitude']), 6),
+                'longitude': round(float(cluster['longitude']), 6),
+            }
+            for cluster in clusters
+        ])
+
+
+class PropertyExportView(generics.GenericAPIView):
+    """
+    GET: Stream the filtered catalogue, with images and owner, as NDJSON
+    (default) or CSV (`?output=csv`). Accepts PropertyView's filters plus
+    `updated_since` (ISO 8601) for incremental pulls.
+    """
+    queryset = Property.objects.all()
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, PropertySearchFilter]
+    filterset_class = PropertyFilter
+    search_fields = ['title', 'description', 'location']
+    chunk_size = 500
+
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in FORMATS:
+            return Response(
+                {'error': f'output must be one of: {", ".join(FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        updated_since = request.query_params.get('updated_since')
+        if updated_since:
+            since = parse_updated_since(updated_since)
+            if since is None:
+                return Response({'error': 'updated_since must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(updated_at__gte=since)
+
+        response = StreamingHttpResponse(export_stream(queryset, output, self.chunk_size), content_type=FORMATS[output])
+        response['Content-Disposition'] = f'attachment; filename="properties.{output}"'
+        return response
+
+
+class PropertyCacheStatsView(APIView):
+    """
+    GET: Hit/miss counters of the listing cache in this process.
+    """
+    permission_classes = [IsAdmin | IsSuperAdmin]
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class PropertyImageStatsView(APIView):
+    """
+    GET: State of the image upload queue, and the uploads and bytes saved
+    by reusing identical files.
+    """
+    permission_classes = [IsAdmin | IsSuperAdmin]
+
+    def get(self, request):
+        counts = dict(
+            PropertyImage.objects.exclude(status=PropertyImage.READY)
+            .values_list('status').annotate(count=Count('id')).order_by()
+        )
+        return Response({
+            'pending': counts.get(PropertyImage.PENDING, 0),
+            'failed': counts.get(PropertyImage.FAILED, 0),
+            **dedup_stats(),
+        })
+
+
 class MyPropertiesView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
 
     def get(self, request):
-        properties = Property.objects.filter(owner=request.user)
-        serializer = PropertySerializer(properties, many=True)
-        return Response(serializer.data)
+        fields = fields_from_request(request.query_params)
+        properties = property_values(Property.objects.filter(owner=request.user), fields)
+        return Response(serialize_properties(list(properties), fields=fields))
 
 
 class SellerPropertyApprove(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAdmin | IsSuperAdmin]
     def post (self, request, id=None):
-        property_instance = Property.objects.get(pk=id)
         action = request.data.get('action')
+        if action not in ACTIONS:
+            return Response({'error': 'action must be "approve" or "reject".'}, status=status.HTTP_400_BAD_REQUEST)
+        # Shares bulk_moderate's locking, so repeating a decision that is
+        # already in place changes nothing and notifies nobody.
+        outcome = bulk_moderate([id], action)[id]
+        if outcome == NOT_FOUND:
+            raise Http404
         if action == 'approve':
-            property_instance.status = 'Approved'
-            property_instance.is_published = True
-            property_instance.save()
             return Response({'message': 'Property approved and published.'}, status=status.HTTP_200_OK)
-        
-        elif action == 'reject':
-            property_instance.status = 'Rejected'
-            property_instance.is_published = False
-            property_instance.save()
-            return Response({'message': 'Property rejected.'}, status=status.HTTP_200_OK)
+        return Response({'message': 'Property rejected.'}, status=status.HTTP_200_OK)
+
+
+class PropertyBulkModerationView(APIView):
+    """
+    POST: Approve or reject many listings at once.
+    Body: {"ids": [1, 2, 3], "action": "approve" | "reject"}
+    Responds with the outcome per id: updated, unchanged or not_found.
+    """
+    permission_classes = [IsAdmin | IsSuperAdmin]
+
+    def post(self, request):
+        serializer = BulkModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        outcomes = bulk_moderate(serializer.validated_data['ids'], serializer.validated_data['action'])
+        return Response({
+            'action': serializer.validated_data['action'],
+            'updated': sum(outcome == UPDATED for outcome in outcomes.values()),
+            'results': [{'id': pk, 'outcome': outcome} for pk, outcome in outcomes.items()],
+        }, status=status.HTTP_200_OK)
+
+
+
+class ModerationQueueView(APIView):
+    """
+    POST: Claim the next pending listings to review.
+    Body: {"limit": 10}. Each listing is leased to the caller until
+    `lease_expires_at`; other moderators are handed different listings.
+    """
+    permission_classes = [IsAdmin | IsSuperAdmin]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+
+    def post(self, request):
+        serializer = ModerationClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fields = fields_from_request(request.query_params)
+        property_ids, expires_at = claim_pending(request.user, serializer.validated_data['limit'])
+        properties = property_values(
+            Property.objects.filter(pk__in=property_ids).order_by('created_at', 'id'), fields,
+        )
+        return Response({
+            'lease_expires_at': expires_at,
+            'results': serialize_properties(list(properties), fields=fields),
+        })
+
+
+class ModerationReleaseView(APIView):
+    """
+    POST: Hand claimed listings back to the queue.
+    Body: {"ids": [1, 2]}, or no ids to release every claim of the caller.
+    """
+    permission_classes = [IsAdmin | IsSuperAdmin]
+
+    def post(self, request):
+        serializer = ModerationReleaseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        released = release_claims(request.user, serializer.validated_data.get('ids'))
+        return Response({'released': released})
+
+
+
+class OwnedPropertyMixin:
+    def get_owned_property(self, request, id):
+        property_instance = get_object_or_404(Property, pk=id)
+        if property_instance.owner_id != request.user.id:
+            raise PermissionDenied('Only the owner can add images to this property.')
+        return property_instance
+
+
+class PropertyUploadSignatureView(OwnedPropertyMixin, APIView):
+    """
+    POST: Signed parameters for uploading photos of a listing directly to
+    Cloudinary. Post the files with these form fields to `upload_url`, then
+    confirm the uploads.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, id):
+        property_instance = self.get_owned_property(request, id)
+        try:
+            return Response(signed_upload_params(property_instance.pk))
+        except DirectUploadsUnavailable as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class PropertyUploadConfirmView(OwnedPropertyMixin, APIView):
+    """
+    POST: Record directly uploaded photos as images of a listing.
+    Body: {"images": [{"public_id", "version", "signature", "format"}, ...]},
+    as returned by Cloudinary. Nothing is stored unless every upload checks
+    out; uploads confirmed before are ignored.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, id):
+        property_instance = self.get_owned_property(request, id)
+        serializer = DirectUploadConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            urls, errors = confirmed_urls(property_instance.pk, serializer.validated_data['images'])
+        except DirectUploadsUnavailable as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        if errors:
+            return Response({'images': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            existing = set(property_instance.images.filter(image__in=urls).values_list('image', flat=True))
+            new_urls = [url for url in dict.fromkeys(urls) if url not in existing]
+            first_position = next_position(property_instance)
+            images = [
+                PropertyImage(property=property_instance, image=url, position=first_position + index)
+                for index, url in enumerate(new_urls)
+            ]
+            for image in images:
+                image.set_variants()
+            images = PropertyImage.objects.bulk_create(images)
+            if images:
+                # bulk_create sends no signals, so update cover and ETag here.
+                images_changed(property_instance.pk)
 
+        return Response(
+            {'created': len(images), 'images': PropertyImageSerializer(images, many=True).data},
+            status=status.HTTP_201_CREATED if images else status.HTTP_200_OK,
+        )
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 from datetime import timedelta
 
@@ -48,13 +49,14 @@ INSTALLED_APPS = [
     'properties',
     'favorites',
     'inquiries',
+    'notifications',
     'corsheaders',
 ]
 
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ClaimsJWTAuthentication",
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -62,8 +64,61 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',  # ✅ Pagination
     'PAGE_SIZE': 10,  # ✅ এক পেজে কয়টা রেকর্ড থাকবে
+    # Reverse proxies in front of the app. Throttles trust only the
+    # X-Forwarded-For entries they append; 0 keys on REMOTE_ADDR.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Property list/detail responses. Point this at a shared backend
+    # (Redis, Memcached) when running more than one process.
+    'properties': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'properties',
+    },
+}
+PROPERTY_CACHE_ALIAS = 'properties'
+PROPERTY_CACHE_TIMEOUT = 300
+# Seconds the facet counts for one filter set stay cached
+PROPERTY_FACETS_CACHE_TIMEOUT = 60
+# Seconds the most-saved ranking stays cached
+PROPERTY_RANKING_CACHE_TIMEOUT = 60
+# Seconds a moderator keeps the listings claimed from the moderation queue
+PROPERTY_MODERATION_LEASE_SECONDS = 300
+# Seconds a user's favorited listing ids stay cached (invalidated on change)
+FAVORITE_IDS_CACHE_TIMEOUT = 600
+
+# Seller notifications are queued in the outbox and emailed by `manage.py send_notifications`
+NOTIFICATION_MAX_ATTEMPTS = 5
+
+# Write requests allowed per endpoint scope, per authenticated user and per
+# client IP, over a sliding window (see real_state/throttling.py)
+THROTTLE_RATES = {
+    'login': {'ip': '10/min'},
+    'register': {'ip': '5/hour'},
+    'inquiry': {'user': '20/hour', 'ip': '60/hour'},
+    'favorite': {'user': '60/min', 'ip': '120/min'},
+}
+# Cache alias holding the throttle counters; None counts in process memory (single node only)
+THROTTLE_CACHE_ALIAS = None
+
+# Seconds each process trusts a user's cached token_version before re-reading it;
+# None skips the check and trusts token claims until the token expires
+ACCOUNTS_TOKEN_VERSION_CACHE_TIMEOUT = 30
+# Cache alias holding those versions; a shared backend makes role changes apply at once everywhere
+ACCOUNTS_TOKEN_VERSION_CACHE_ALIAS = 'default'
+
+# Listing photos are queued and uploaded by `manage.py process_image_uploads`
+PROPERTY_IMAGE_UPLOADER = 'properties.uploads.cloudinary_uploader'
+PROPERTY_IMAGE_UPLOAD_MAX_ATTEMPTS = 5
+# Delay before the first retry, doubled after every further failure
+PROPERTY_IMAGE_UPLOAD_BACKOFF_SECONDS = 30
+# How long a worker may hold a job before another worker retries it
+PROPERTY_IMAGE_UPLOAD_LEASE_SECONDS = 600
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -112,6 +167,22 @@ DATABASES = {
     }
 }
 
+# The test suite runs against SQLite so it does not need a PostgreSQL server
+if 'test' in sys.argv:
+    # Tests run against PostgreSQL like production, so its full-text search,
+    # EXPLAIN checks and SKIP LOCKED paths are covered. TEST_DATABASE=sqlite
+    # opts in to a quick local run without a database server.
+    if os.getenv('TEST_DATABASE') == 'sqlite':
+        DATABASES = {
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': BASE_DIR / 'db.sqlite3',
+            }
+        }
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    CACHES['properties'] = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    THROTTLE_RATES = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -149,6 +220,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files waiting in the image upload queue
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,173 @@
+"""
+Sliding-window request throttles.
+
+Each endpoint names a scope (`login`, `inquiry`, ...) and `THROTTLE_RATES`
+gives that scope a rate per authenticated user and/or per client IP. A
+request is counted in the current fixed window, and the previous window's
+count is weighted by how much of it still overlaps the sliding window:
+
+    estimate = previous * (1 - elapsed / duration) + current
+
+That needs two counters per key instead of a timestamp log, and the counter
+increment is a single atomic `incr` on a shared cache. Rejected requests are
+counted too, so a client hammering the login endpoint stays locked out
+instead of getting a fresh password check every time a slot frees up.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class LocalCounters:
+    """
+    Expiring counters in this process' memory. Cheap, but every process
+    counts on its own, so only suitable for single-node deployments.
+    """
+    max_entries = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            entries = {key: self._counters.get(key) for key in keys}
+        return {key: entry[0] for key, entry in entries.items() if entry and entry[1] > now}
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            count, expires = self._counters.get(key, (0, 0))
+            if expires <= now:
+                count, expires = 0, now + timeout
+                if len(self._counters) >= self.max_entries:
+                    self._prune(now)
+            self._counters[key] = (count + 1, expires)
+            return count + 1
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def _prune(self, now):
+        self._counters = {key: entry for key, entry in self._counters.items() if entry[1] > now}
+
+
+class CacheCounters:
+    """Counters in a Django cache, shared by every process using it."""
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+    def incr(self, key, timeout):
+        if self.cache.add(key, 1, timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr().
+            self.cache.set(key, 1, timeout)
+            return 1
+
+
+local_counters = LocalCounters()
+
+
+def get_counters():
+    alias = settings.THROTTLE_CACHE_ALIAS
+    return CacheCounters(alias) if alias else local_counters
+
+
+def retry_after(previous, current, limit, duration, elapsed):
+    """Seconds until the sliding-window estimate drops back to `limit`."""
+    if current <= limit:
+        # Wait for enough of the previous window to slide out.
+        seconds = (1 - (limit - current) / previous) * duration - elapsed
+    else:
+        # This window alone is over the limit; it has to become the previous one.
+        seconds = duration - elapsed + (1 - limit / current) * duration
+    return max(1, math.ceil(seconds))
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base class; subclasses set `kind` ('user' or 'ip') and implement
+    `get_key_ident()`. Only unsafe methods are throttled.
+    """
+    scope = None
+    kind = None
+    timer = time.time
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if request.method in SAFE_METHODS:
+            return True
+        rate = settings.THROTTLE_RATES.get(self.scope, {}).get(self.kind)
+        ident = self.get_key_ident(request)
+        if not rate or ident is None:
+            return True
+
+        limit, duration = parse_rate(rate)
+        now = self.timer()
+        window, elapsed = divmod(now, duration)
+        prefix = f'throttle:{self.scope}:{self.kind}:{ident}'
+        counters = get_counters()
+        current_key, previous_key = f'{prefix}:{int(window)}', f'{prefix}:{int(window) - 1}'
+        current = counters.incr(current_key, duration * 2)
+        previous = counters.get_many([previous_key]).get(previous_key, 0)
+
+        if previous * (1 - elapsed / duration) + current <= limit:
+            return True
+        self.wait_seconds = retry_after(previous, current, limit, duration, elapsed)
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+    def get_key_ident(self, request):
+        raise NotImplementedError
+
+
+class UserThrottle(SlidingWindowThrottle):
+    """Counts requests per authenticated user; anonymous requests pass."""
+    kind = 'user'
+
+    def get_key_ident(self, request):
+        return request.user.pk if request.user and request.user.is_authenticated else None
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """
+    Counts requests per client address. X-Forwarded-For is only read as far
+    as REST_FRAMEWORK['NUM_PROXIES'] trusted proxies appended to it, so a
+    client cannot pick its own key by sending the header.
+    """
+    kind = 'ip'
+
+    def get_key_ident(self, request):
+        return self.get_ident(request)
+
+
+def scoped_throttles(scope):
+    """Throttle classes for an endpoint, for `throttle_classes`."""
+    return [
+        type(f'{scope.title()}{throttle.__name__}', (throttle,), {'scope': scope})
+        for throttle in (UserThrottle, IPThrottle)
+    ]
@@ -19,11 +19,10 @@ from django.urls import path, include
 from . import views
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
-    TokenRefreshView,
 )
 from rest_framework.response import Response
 from rest_framework import status
-from accounts.views import MyTokenObtainPairView
+from accounts.views import MyTokenObtainPairView, MyTokenRefreshView
 class CustomTokenObtainPairView(TokenObtainPairView):
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
@@ -39,5 +38,5 @@ urlpatterns = [
     path('favorites/', include('favorites.urls')),
     path('inquiries/', include('inquiries.urls')),
        path('api/token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', MyTokenRefreshView.as_view(), name='token_refresh'),
 ]
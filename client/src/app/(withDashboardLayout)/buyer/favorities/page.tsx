@@ -17,6 +17,8 @@ const FavouritePage = () => {
   const [response, setResponse] = useState<Favorite[] | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const { user } = useUser();
 
   useEffect(() => {
@@ -24,9 +26,9 @@ const FavouritePage = () => {
       if (!user) return; // ✅ Don't fetch if user is not logged in
 
       try {
-        const data = await getFavoriteProperties();
-        setResponse(data);
-        console.log("Fetched favorite properties:", data);
+        const page = await getFavoriteProperties();
+        setResponse(page.results);
+        setNextPage(page.next);
       } catch (err) {
         setError("Failed to fetch favorites");
         console.error("Error fetching favorites:", err);
@@ -38,6 +40,20 @@ const FavouritePage = () => {
     fetchData();
   }, [user]);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const page = await getFavoriteProperties(nextPage);
+      setResponse(prev => [...(prev ?? []), ...page.results]);
+      setNextPage(page.next);
+    } catch (err) {
+      console.error("Error fetching favorites:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div className="p-4">
       <h1 className="text-xl font-bold mb-4">My Favorites</h1>
@@ -63,6 +79,18 @@ const FavouritePage = () => {
           ) : (
             <p>No favorite properties found.</p>
           )}
+
+          {nextPage && (
+            <div className="flex justify-center mt-6">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 disabled:opacity-60 transition"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
 
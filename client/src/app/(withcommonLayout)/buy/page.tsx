@@ -1,28 +1,24 @@
 'use client';
 
 import { Property } from "@/lib/type";
-import { getProperties } from "@/service/properties";
+import { getPropertyPage } from "@/service/properties";
 import Image from "next/image";
 import Link from "next/link";
 import { useEffect, useState } from "react";
 
 const BuyHomePage = () => {
-  const [properties, setProperties] = useState<Property[]>([]);
   const [filteredProperties, setFilteredProperties] = useState<Property[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
 useEffect(() => {
   const fetchData = async () => {
     try {
-      const data = await getProperties();
-      setProperties(data);
-
-      const filtered = data.filter(
-        (property: Property) =>
-          
-          property.purpose === 'For Sale'
-      );
-      setFilteredProperties(filtered);
+      // Filter on the server; the listing is paginated.
+      const page = await getPropertyPage({ purpose: 'For Sale' });
+      setFilteredProperties(page.results);
+      setNextPage(page.next);
     } catch (error) {
       console.error('Error fetching properties:', error);
     } finally {
@@ -33,6 +29,20 @@ useEffect(() => {
   fetchData();
 }, []);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPropertyPage(undefined, nextPage);
+      setFilteredProperties((current) => [...current, ...page.results]);
+      setNextPage(page.next);
+    } catch (error) {
+      console.error('Error fetching properties:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
 
   if (loading) {
     return (
@@ -70,7 +80,7 @@ useEffect(() => {
           <div className="flex justify-center mt-6">
             <div className="bg-white rounded-full px-6 py-3 shadow-lg">
               <span className="text-blue-600 font-semibold">
-                {filteredProperties.length} Houses Available
+                {filteredProperties.length}{nextPage ? '+' : ''} Houses Available
               </span>
             </div>
           </div>
@@ -78,6 +88,7 @@ useEffect(() => {
 
         {/* Properties Grid */}
         {filteredProperties.length > 0 ? (
+          <>
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
             {filteredProperties.map((property) => (
               <div 
@@ -87,7 +98,7 @@ useEffect(() => {
                 {/* Property Image */}
                 <div className="relative h-48 overflow-hidden">
                   <Image 
-                    src={property.images?.[0]?.image || 'https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=600&h=400&fit=crop'}
+                    src={property.cover_image || property.images?.[0]?.image || 'https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=600&h=400&fit=crop'}
                     alt={property.title}
                     width={600}
                     height={400}
@@ -156,6 +167,17 @@ useEffect(() => {
               </div>
             ))}
           </div>
+          {nextPage && (
+            <div className="flex justify-center mt-10">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="bg-blue-600 hover:bg-blue-700 disabled:opacity-60 text-white px-6 py-3 rounded-lg transition-colors duration-200 font-semibold">
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
+          </>
         ) : (
           <div className="text-center py-16">
             <div className="bg-white rounded-xl shadow-lg p-8 max-w-md mx-auto">
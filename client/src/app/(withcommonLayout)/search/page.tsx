@@ -1,15 +1,27 @@
 // app/search/page.tsx
 
-import { getProperties } from "@/service/properties";
+import Link from "next/link";
+import { getPropertyPage } from "@/service/properties";
 import { type Property } from "@/lib/type";
 import { PropertyCard } from "@/homesection/PropertyCard";
 
 interface SearchPageProps {
-  searchParams: { search?: string };
+  searchParams: { search?: string; cursor?: string };
 }
 
+// Link to the same search at the cursor of an API page link.
+const pageHref = (search: string | undefined, apiLink: string | null) => {
+  const cursor = apiLink ? new URL(apiLink).searchParams.get("cursor") : null;
+  if (!cursor) return null;
+  const query = new URLSearchParams({ ...(search ? { search } : {}), cursor });
+  return `/search?${query.toString()}`;
+};
+
 export default async function SearchPage({ searchParams }: SearchPageProps) {
-  const properties: Property[] = await getProperties(searchParams);
+  const page = await getPropertyPage(searchParams);
+  const properties: Property[] = page.results;
+  const nextHref = pageHref(searchParams.search, page.next);
+  const previousHref = pageHref(searchParams.search, page.previous);
 
   return (
     <div className="max-w-6xl mx-auto py-10 px-4">
@@ -27,6 +39,20 @@ export default async function SearchPage({ searchParams }: SearchPageProps) {
           ))}
         </div>
       )}
+      {(previousHref || nextHref) && (
+        <div className="flex justify-between mt-8">
+          {previousHref ? (
+            <Link href={previousHref} className="px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700">
+              Previous
+            </Link>
+          ) : <span />}
+          {nextHref && (
+            <Link href={nextHref} className="px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700">
+              Next
+            </Link>
+          )}
+        </div>
+      )}
     </div>
   );
 }
@@ -1,7 +1,7 @@
 'use client'
 
 import { useEffect, useState } from "react"
-import { getProperties } from "@/service/properties/index"
+import { getPropertyPage } from "@/service/properties/index"
 import { type Property, type PropertyFilterParams } from "@/lib/type"
 import PropertyMarquee from "./carosel/PropertyMarquee"
 
@@ -17,14 +17,17 @@ const Property = () => {
   const [properties, setProperties] = useState<Property[]>([])
   const [loading, setLoading] = useState(false)
   const [filters, setFilters] = useState<PropertyFilterParams>(defaultFilters)
+  const [nextPage, setNextPage] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   // 🔁 Fetch properties when filters change
   useEffect(() => {
     const fetchProperties = async () => {
       setLoading(true)
       try {
-        const data = await getProperties(filters)
-        setProperties(data)
+        const page = await getPropertyPage(filters)
+        setProperties(page.results)
+        setNextPage(page.next)
       } catch (error) {
         console.error("Error fetching properties:", error)
       } finally {
@@ -35,6 +38,20 @@ const Property = () => {
     fetchProperties()
   }, [filters])
 
+  const loadMore = async () => {
+    if (!nextPage) return
+    setLoadingMore(true)
+    try {
+      const page = await getPropertyPage(undefined, nextPage)
+      setProperties(prev => [...prev, ...page.results])
+      setNextPage(page.next)
+    } catch (error) {
+      console.error("Error fetching properties:", error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   // 🛠️ Handle input/select changes
   const handleChange = (e: React.ChangeEvent<HTMLInputElement | HTMLSelectElement>) => {
     setFilters(prev => ({
@@ -125,7 +142,20 @@ const Property = () => {
             <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
           </div>
         ) : (
-          <PropertyMarquee properties={properties} />
+          <>
+            <PropertyMarquee properties={properties} />
+            {nextPage && (
+              <div className="flex justify-center mt-6">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-6 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 disabled:opacity-60 transition"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
+          </>
         )}
       </div>
     </div>
@@ -62,7 +62,7 @@ const router = useRouter();
       {/* Image Section */}
       <div className="relative">
         <Image 
-       src={property.images?.[0]?.image || 'https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=600&h=400&fit=crop'}
+       src={property.cover_image || property.images?.[0]?.image || 'https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=600&h=400&fit=crop'}
 
           alt={property.title}
             width={600}
@@ -20,7 +20,8 @@ export type Property ={
   property_type: string;
   purpose: string; // e.g., "For Sale" or "For Rent"
   is_published: boolean;
-  images: { image: string }[]; // Assuming images is an array of objects with
+  cover_image?: string; // Thumbnail of the first ready image
+  images: { image: string; thumbnail_url?: string; medium_url?: string; large_url?: string }[]; // Assuming images is an array of objects with
   // Add other fields that are part of your Property object
 }
 
@@ -35,4 +36,6 @@ export interface PropertyFilterParams {
   bedrooms?: string;
   bathrooms?: string;
   property_type?: string;
+  // Opaque position from a page's `next`/`previous` link.
+  cursor?: string;
 }
\ No newline at end of file
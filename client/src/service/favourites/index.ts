@@ -84,9 +84,20 @@ export  const removeFavorite = async (id: string) => {
     throw error;
   }
 }
-export const getFavoriteProperties = async () => {
+export interface FavoritePage {
+  results: any[]
+  next: string | null
+}
+
+// One page of the user's favorites. Pass the previous page's `next` link to
+// continue from where it ended.
+export const getFavoriteProperties = async (next?: string | null): Promise<FavoritePage> => {
   try {
-    const res = await authenticatedFetch(`${process.env.NEXT_PUBLIC_BASE_API}/favorites/`,
+    const base = `${process.env.NEXT_PUBLIC_BASE_API}/favorites/`
+    if (next && !next.startsWith(`${base}?`)) {
+      throw new Error('Invalid page link')
+    }
+    const res = await authenticatedFetch(next || base,
       {
         method: 'GET',
    
@@ -95,9 +106,39 @@ export const getFavoriteProperties = async () => {
     if (!res.ok) {
       throw new Error(`Error fetching favorite properties: ${res.statusText}`);
     }
-    return res.json();
+    const data = await res.json();
+    // cursor-paginated: { next, previous, results }
+    return { results: data.results, next: data.next };
   } catch (error) {
     console.error("Failed to fetch favorite properties:", error);
     throw error;
   } 
-}
\ No newline at end of file
+}
+
+// Ids of the user's favorited listings, e.g. to draw heart icons on search results
+export const getFavoriteIds = async (): Promise<number[]> => {
+  const res = await authenticatedFetch(`${process.env.NEXT_PUBLIC_BASE_API}/favorites/ids/`, {
+    method: 'GET',
+  });
+  if (!res.ok) {
+    throw new Error(`Error fetching favorite ids: ${res.statusText}`);
+  }
+  const data = await res.json();
+  return data.ids;
+}
+
+// Apply hearts queued while offline in one request; safe to retry
+export const syncFavorites = async (add: number[], remove: number[]): Promise<number[]> => {
+  const res = await authenticatedFetch(`${process.env.NEXT_PUBLIC_BASE_API}/favorites/sync/`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ add, remove }),
+  });
+  if (!res.ok) {
+    throw new Error(`Error syncing favorites: ${res.statusText}`);
+  }
+  const data = await res.json();
+  return data.ids;
+}
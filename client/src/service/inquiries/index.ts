@@ -75,7 +75,8 @@ export const getInquiries = async () => {
     if (!res.ok) {
       throw new Error(`Error fetching inquiries: ${res.statusText}`);
     }
-    return res.json();
+    const data = await res.json();
+    return data.results; // cursor-paginated: { next, previous, results }
   } catch (error) {
     console.error("Failed to fetch inquiries:", error);
     throw error;
@@ -51,22 +51,37 @@ const authenticatedFetch = async (url: string, options: RequestInit = {}) => {
 
 
 
-export const getProperties = async (params?: PropertyFilterParams) => {
+export interface PropertyPage {
+  results: any[]
+  next: string | null
+  previous: string | null
+}
+
+// One page of the cursor-paginated listing. Pass the previous page's `next`
+// link to continue from where it ended.
+export const getPropertyPage = async (params?: PropertyFilterParams, next?: string | null): Promise<PropertyPage> => {
   try {
-    // Clean only valid, non-empty params and convert all to string
-    const cleanedParams: Record<string, string> = {}
-    if (params) {
-      for (const key in params) {
-        const value = params[key as keyof PropertyFilterParams]
-        if (value !== undefined && value !== '') {
-          cleanedParams[key] = String(value)
+    let url: string
+    if (next) {
+      if (!next.startsWith(`${process.env.NEXT_PUBLIC_BASE_API}/properties/`)) {
+        throw new Error('Invalid page link')
+      }
+      url = next
+    } else {
+      // Clean only valid, non-empty params and convert all to string
+      const cleanedParams: Record<string, string> = {}
+      if (params) {
+        for (const key in params) {
+          const value = params[key as keyof PropertyFilterParams]
+          if (value !== undefined && value !== '') {
+            cleanedParams[key] = String(value)
+          }
         }
       }
+      const query = new URLSearchParams(cleanedParams).toString()
+      url = `${process.env.NEXT_PUBLIC_BASE_API}/properties/?${query}`
     }
 
-    const query = new URLSearchParams(cleanedParams).toString()
-    const url = `${process.env.NEXT_PUBLIC_BASE_API}/properties/?${query}`
-
     const res = await fetch(url, {
       method: "GET",
       next: { tags: ["PROPERTY"] },
@@ -78,7 +93,9 @@ export const getProperties = async (params?: PropertyFilterParams) => {
       throw new Error(errorData.error || errorData.detail || 'Failed to fetch properties')
     }
 
-    return res.json()
+    // The listing is cursor paginated: { next, previous, results }
+    const data = await res.json()
+    return { results: data.results, next: data.next, previous: data.previous }
   } catch (error: any) {
     throw new Error(`Operation failed: ${error.message || error}`)
   }